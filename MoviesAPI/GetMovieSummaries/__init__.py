@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import os
+import azure.functions as func
+
+from shared_code import cosmos, diagnostics, responses, summaries, titles
+
+# Batch version of GetMovieSummary for grids of titles:
+#   POST /api/getmoviesummaries  {"titles": ["Inception", "The Dark Knight"]}
+# All movies are fetched with one query and stored summaries with another;
+# only the missing summaries are generated, at most
+# SUMMARY_BATCH_CONCURRENCY at a time. Results come back in input order, each
+# with its own status so one failure does not sink the batch.
+
+def max_titles():
+    return int(os.getenv('SUMMARY_BATCH_MAX_TITLES', '50'))
+
+def concurrency():
+    return int(os.getenv('SUMMARY_BATCH_CONCURRENCY', '4'))
+
+def parse_titles(req):
+    try:
+        body = req.get_json()
+    except ValueError:
+        raise ValueError('Request body must be JSON like {"titles": ["Inception"]}.')
+
+    title_list = body.get("titles") if isinstance(body, dict) else None
+    if not isinstance(title_list, list) or not all(isinstance(title, str) for title in title_list):
+        raise ValueError('Request body must be JSON like {"titles": ["Inception"]}.')
+    if not title_list:
+        raise ValueError("Please provide at least one movie title.")
+    if len(title_list) > max_titles():
+        raise ValueError(f"At most {max_titles()} titles can be requested at once.")
+    return title_list
+
+async def main(req: func.HttpRequest) -> func.HttpResponse:
+    logging.info('Python HTTP trigger function processed a request.')
+    diagnostics.log_stats()
+
+    try:
+        title_list = parse_titles(req)
+    except ValueError as e:
+        return func.HttpResponse(str(e), status_code=400)
+
+    try:
+        movies = await titles.read_movies(title_list)
+    except cosmos.exceptions.CosmosHttpResponseError as e:
+        return func.HttpResponse("Error connecting to Cosmos DB: " + str(e), status_code=500)
+
+    force_refresh = req.params.get('refresh', '').lower() in ('1', 'true', 'yes')
+    cached = {} if force_refresh else await summaries.get_cached_many(movies.values())
+
+    # One generation per distinct movie, even if a title is repeated in the batch
+    semaphore = asyncio.Semaphore(concurrency())
+    pending = {}
+
+    async def generate(movie):
+        async with semaphore:
+            return await summaries.generate(movie)
+
+    for movie_id, movie in movies.items():
+        if summaries.summary_id(movie) not in cached:
+            pending[movie_id] = asyncio.ensure_future(generate(movie))
+    if pending:
+        await asyncio.gather(*pending.values(), return_exceptions=True)
+
+    results = []
+    for title in title_list:
+        movie = movies.get(titles.title_id(title))
+        if movie is None:
+            results.append({"title": title, "status": 404, "error": f"No movie found with the title: {title}"})
+            continue
+
+        summary = cached.get(summaries.summary_id(movie))
+        if summary is None:
+            task = pending[movie["id"]]
+            if task.exception() is not None:
+                logging.error(f"Error calling Mistral API for {movie['title']}: {str(task.exception())}")
+                results.append({"title": title, "status": 500, "error": "Error generating movie summary."})
+                continue
+            summary = task.result()
+
+        results.append(dict(summaries.summary_item(movie, summary), status=200))
+
+    return responses.respond(req, results)
@@ -1,88 +1,61 @@
 import logging
-import os
-import json
-import requests
 import azure.functions as func
-from azure.cosmos import CosmosClient
 
-# Retrieve environment variables
-cosmos_endpoint = os.getenv('COSMOS_ENDPOINT')
-cosmos_key = os.getenv('COSMOS_KEY')
-cosmos_database_id = os.getenv('COSMOS_DATABASE_ID')
-cosmos_container_id = os.getenv('COSMOS_CONTAINER_ID')
-mistral_api_key = os.getenv('mistral_api_key')
+from shared_code import diagnostics, responses, search, summaries, titles
+from shared_code.single_flight import SingleFlight
 
-# Initialize Cosmos client
-client = CosmosClient(cosmos_endpoint, cosmos_key)
+lookups = SingleFlight()
 
-# Access the database and container
-database = client.get_database_client(cosmos_database_id)
-container = database.get_container_client(cosmos_container_id)
+def summary_response(req, movie_info, summary):
+    # Construct the final output with the correct format
+    final_output = [summaries.summary_item(movie_info, summary)]
 
-def main(req: func.HttpRequest) -> func.HttpResponse:
-    logging.info('Python HTTP trigger function processed a request.')
-
-    # Extract the movie title from the route parameters
-    movie_title = req.route_params.get('title')
-    if not movie_title:
-        return func.HttpResponse("Please provide a movie title.", status_code=400)
-
-    # Query the Cosmos DB for the specified movie title
-    query = f"SELECT * FROM c WHERE c.title = @title"
-    parameters = [{"name": "@title", "value": movie_title}]
-    movie_data = list(container.query_items(query=query, parameters=parameters, enable_cross_partition_query=True))
+    # Return the formatted movie data as JSON (or MessagePack when asked for)
+    return responses.respond(req, final_output)
 
-    if not movie_data:
-        return func.HttpResponse(f"No movie found with the title: {movie_title}", status_code=404)
+async def find_summary(movie_title, force_refresh):
+    # Returns (movie_info, summary); movie_info is None for an unknown title
+    # and summary is None when generation failed.
 
-    # Extract movie information for the prompt
-    movie_info = movie_data[0]
-    user_prompt = (
-        f"Write a concise summary for the movie '{movie_info['title']}', "
-        # f"released in {movie_info['releaseYear']}, with the genre {movie_info['genre']}, "
-        f"in no more than 3-4 sentences."
-    )
+    # Point-read the movie by its title id instead of querying every partition
+    movie_info = await titles.read_movie(movie_title)
+    if movie_info is None:
+        # "dark knight" or "Shawshank": use the closest title when the match
+        # is clear enough (SEARCH_FALLBACK_MIN_SCORE / _MIN_MARGIN)
+        movie_info = await search.best_match(movie_title)
+        if movie_info is None:
+            return None, None
+        logging.info(f"No exact title match for {movie_title}; using {movie_info['title']}.")
 
-    # Prepare the request to the Mistral API
-    mistral_url = "https://api.mistral.ai/v1/chat/completions"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {mistral_api_key}"
-    }
-    payload = {
-        "model": "mistral-small-latest",
-        "messages": [{"role": "user", "content": user_prompt}],
-        "temperature": 0.7,
-        "top_p": 1,
-        "max_tokens": 200,
-        "stream": False,
-        "safe_prompt": False
-    }
+    # Serve a stored summary unless the caller asked for a fresh one
+    if not force_refresh:
+        cached = await summaries.get_cached(movie_info)
+        if cached is not None:
+            return movie_info, cached
 
-    # Make the request to generate the summary
+    # Generate the summary through the shared, pooled Mistral client
     try:
-        response = requests.post(mistral_url, headers=headers, json=payload)
-        response_data = response.json()
-
-        # Extract the summary content and replace newline characters with HTML <br> tags
-        summary = response_data['choices'][0]['message']['content']
-        formatted_summary = summary.replace('\n', '<br>')
+        return movie_info, await summaries.generate(movie_info)
+    except Exception as e:
+        logging.error(f"Error calling Mistral API: {str(e)}")
+        return movie_info, None
 
-        # Add the generated summary to the movie information
-        movie_info['generatedSummary'] = formatted_summary
+async def main(req: func.HttpRequest) -> func.HttpResponse:
+    logging.info('Python HTTP trigger function processed a request.')
+    diagnostics.log_stats(summary_lookups=lookups.stats)
 
-        # Construct the final output with the correct format
-        final_output = [{
-            "title": movie_info["title"],
-            "releaseYear": movie_info["releaseYear"],
-            "genre": movie_info["genre"],
-            "coverUrl": movie_info["coverUrl"],
-            "generatedSummary": formatted_summary
-        }]
+    # Extract the movie title from the route parameters
+    movie_title = req.route_params.get('title')
+    if not movie_title:
+        return func.HttpResponse("Please provide a movie title.", status_code=400)
 
-        # Return the formatted movie data as JSON
-        return func.HttpResponse(json.dumps(final_output, indent=4), mimetype="application/json")
+    # Concurrent requests for the same title share one lookup and generation
+    force_refresh = req.params.get('refresh', '').lower() in ('1', 'true', 'yes')
+    key = (titles.title_id(movie_title), force_refresh)
+    movie_info, summary = await lookups.do(key, lambda: find_summary(movie_title, force_refresh))
 
-    except Exception as e:
-        logging.error(f"Error calling Mistral API: {str(e)}")
+    if movie_info is None:
+        return func.HttpResponse(f"No movie found with the title: {movie_title}", status_code=404)
+    if summary is None:
         return func.HttpResponse("Error generating movie summary.", status_code=500)
+    return summary_response(req, movie_info, summary)
@@ -1,32 +1,46 @@
 import azure.functions as func
-import os
-import json
-from azure.cosmos import CosmosClient, exceptions
 
-endpoint = os.environ['COSMOS_ENDPOINT']
-key = os.environ['COSMOS_KEY']
-client = CosmosClient(endpoint, key)
-database_name = 'MoviesDatabase'
-container_name = 'MoviesContainer'
-database = client.get_database_client(database_name)
-container = database.get_container_client(container_name)
+from shared_code import catalog_cache, cosmos, http_cache, paging, projection, responses, streaming
 
-def main(req: func.HttpRequest) -> func.HttpResponse:
+async def main(req: func.HttpRequest) -> func.HttpResponse:
     try:
-        # Query that selects only the necessary attributes
-        query = "SELECT c.title, c.releaseYear, c.genre, c.coverUrl FROM c"
-        items = list(container.query_items(query=query, enable_cross_partition_query=True))
+        page = paging.page_params(req)
+        # ?fields=title,releaseYear trims the documents in the query itself
+        fields = projection.fields_param(req)
+    except ValueError as e:
+        return func.HttpResponse(str(e), status_code=400)
 
-        # Prepare the result to include only the specified fields
-        result = [
-            {"title": item["title"], "releaseYear": item["releaseYear"],
-             "genre": item["genre"], "coverUrl": item["coverUrl"]}
-            for item in items
-        ]
+    stream_format = req.params.get('stream')
+    if stream_format is not None and stream_format not in streaming.FORMATS:
+        return func.HttpResponse(f"stream must be one of: {', '.join(streaming.FORMATS)}.", status_code=400)
 
-        # Convert the result to JSON string
-        json_result = json.dumps(result, indent=4)  # Pretty print the JSON for readability
+    query = projection.select(fields)
+    try:
+        if stream_format is not None:
+            chunks, mimetype = streaming.serialize(streaming.iter_query(cosmos.get_async_container(), query), stream_format)
+            # Documents are encoded one at a time as pages arrive. The v1 worker
+            # needs the whole body up front, so the compact chunks are joined
+            # here and the peak grows with the catalog; only the intermediate
+            # list and pretty-printed copy are avoided.
+            return http_cache.respond(req, await streaming.read_all(chunks), mimetype, "GetMovies")
+
+        if page is not None:
+            # Paged requests read one Cosmos page at a time instead of the whole catalog
+            page_size, continuation = page
+            items, next_token = await paging.query_page(cosmos.get_async_container(), query, page_size, continuation)
+            body = {"movies": items, "continuation": next_token}
+            return responses.respond(req, body, "GetMovies")
+
+        # Served from the per-worker catalog cache; Cosmos is only queried
+        # when the snapshot has expired or the change feed shows a write
+        items = await catalog_cache.get_movies()
 
-        return func.HttpResponse(body=json_result, status_code=200, headers={"Content-Type": "application/json"})
-    except exceptions.CosmosHttpResponseError as e:
+        # The encoded body is reused until the snapshot changes, and
+        # unchanged catalogs are answered with 304 Not Modified
+        return responses.respond_cached(req, ("GetMovies", fields), catalog_cache.version(items), items,
+                                        lambda items: projection.project(items, fields), "GetMovies")
+    except ValueError as e:
+        # A continuation token Cosmos would not accept
+        return func.HttpResponse(str(e), status_code=400)
+    except cosmos.exceptions.CosmosHttpResponseError as e:
         return func.HttpResponse("Error connecting to Cosmos DB: " + str(e), status_code=500)
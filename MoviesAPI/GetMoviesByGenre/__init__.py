@@ -0,0 +1,30 @@
+import azure.functions as func
+
+from shared_code import catalog_cache, cosmos, genres, projection, responses
+
+# Movies by genre, answered from the in-memory genre index:
+#   GET /api/getmoviesbygenre/Action              movies tagged Action
+#   GET /api/getmoviesbygenre/Action,Drama        movies tagged Action and Drama
+#   GET /api/getmoviesbygenre/Action,Drama?match=any   Action or Drama
+# Results are ordered by movie id and accept ?fields= like GetMovies.
+
+async def main(req: func.HttpRequest) -> func.HttpResponse:
+    match = req.params.get('match', 'all').lower()
+    try:
+        wanted = genres.parse_genres(req.route_params.get('genre'))
+        fields = projection.fields_param(req)
+    except ValueError as e:
+        return func.HttpResponse(str(e), status_code=400)
+    if match not in genres.MATCH_MODES:
+        return func.HttpResponse(f"match must be one of: {', '.join(genres.MATCH_MODES)}.", status_code=400)
+
+    try:
+        index = await genres.get_index()
+    except cosmos.exceptions.CosmosHttpResponseError as e:
+        return func.HttpResponse("Error connecting to Cosmos DB: " + str(e), status_code=500)
+
+    # Encoded once per index version, genre set and projection
+    key = ("GetMoviesByGenre", tuple(sorted(wanted)), match, fields)
+    return responses.respond_cached(req, key, catalog_cache.version(index), index,
+                                    lambda index: projection.project(index.movies(wanted, match), fields),
+                                    "GetMoviesByGenre")
@@ -1,34 +1,43 @@
 import azure.functions as func
-import os
-import json
-from azure.cosmos import CosmosClient, exceptions
 
-def main(req: func.HttpRequest) -> func.HttpResponse:
-    # Retrieve the year from the URL path
+from shared_code import catalog_cache, cosmos, paging, partitioning, projection, responses, years
+
+async def main(req: func.HttpRequest) -> func.HttpResponse:
+    # Retrieve the year, or a range such as 2000-2010, 2000- or -1999, from the URL path
     year = req.route_params.get('year')
 
     if not year:
         return func.HttpResponse("Year must be specified in the URL path, e.g., /getmoviesbyyear/2010", status_code=400)
 
-    endpoint = os.environ['COSMOS_ENDPOINT']
-    key = os.environ['COSMOS_KEY']
-    client = CosmosClient(endpoint, key)
-    database_name = 'MoviesDatabase'
-    container_name = 'MoviesContainer'
-    database = client.get_database_client(database_name)
-    container = database.get_container_client(container_name)
-
     try:
-        query = "SELECT c.title, c.releaseYear, c.genre, c.coverUrl FROM c WHERE c.releaseYear = @year"
-        parameters = [{'name': '@year', 'value': year}]
+        first, last = years.parse_range(year)
+        page = paging.page_params(req)
+        fields = projection.fields_param(req)
+    except ValueError as e:
+        return func.HttpResponse(str(e), status_code=400)
 
-        items = list(container.query_items(
-            query=query,
-            parameters=parameters,
-            enable_cross_partition_query=True
-        ))
+    try:
+        if page is not None:
+            if first != last:
+                return func.HttpResponse("Paging is only supported for a single year.", status_code=400)
+            page_size, continuation = page
+            query = projection.select(fields, "c.releaseYear = @year")
+            # releaseYear is stored as a string, e.g. "2010"
+            parameters = [{'name': '@year', 'value': str(first)}]
+            # Single-partition when the container is partitioned by year
+            query_options = partitioning.year_query_options(first)
+            items, next_token = await paging.query_page(cosmos.get_async_container(), query, page_size, continuation, parameters, **query_options)
+            body = {"movies": items, "continuation": next_token}
+            return responses.respond(req, body, "GetMoviesByYear")
 
-        result = [item for item in items]
-        return func.HttpResponse(body=json.dumps(result, indent=4), status_code=200, headers={"Content-Type": "application/json"})
-    except exceptions.CosmosHttpResponseError as e:
+        # Binary search over the sorted year index of the cached catalog;
+        # the encoded result is reused until the index changes
+        index = await years.get_index()
+        return responses.respond_cached(req, ("GetMoviesByYear", first, last, fields), catalog_cache.version(index), index,
+                                        lambda index: projection.project(index.between(first, last), fields),
+                                        "GetMoviesByYear")
+    except ValueError as e:
+        # A continuation token Cosmos would not accept
+        return func.HttpResponse(str(e), status_code=400)
+    except cosmos.exceptions.CosmosHttpResponseError as e:
         return func.HttpResponse("Error connecting to Cosmos DB: " + str(e), status_code=500)
@@ -0,0 +1,17 @@
+import logging
+import azure.functions as func
+
+from shared_code import diagnostics, presummarize
+
+# Generates summaries ahead of time so GetMovieSummary rarely has to call
+# Mistral on the request path. Runs every 15 minutes by default (the NCRONTAB
+# schedule in function.json) and picks up where the previous run stopped.
+
+async def main(mytimer: func.TimerRequest) -> None:
+    if mytimer.past_due:
+        logging.info('Presummarize timer is running late.')
+
+    stats = await presummarize.run()
+    logging.info(f"Presummarized {stats['generated']} of {stats['scanned']} movies "
+                 f"({stats['failed']} failed, pass complete: {stats['complete']}).")
+    diagnostics.log_stats()
@@ -0,0 +1,39 @@
+import azure.functions as func
+
+from shared_code import cosmos, projection, responses, search
+
+# Typo-tolerant title search:
+#   GET /api/searchmovies?q=dark%20knigth&limit=5
+# Returns the best matching movies first, each with its similarity score
+# between 0 and 1. Accepts ?fields= like GetMovies.
+
+def parse_limit(req):
+    limit = req.params.get('limit')
+    if limit is None:
+        return search.DEFAULT_LIMIT
+    try:
+        limit = int(limit)
+    except ValueError:
+        raise ValueError("limit must be a whole number.")
+    if limit < 1 or limit > search.MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {search.MAX_LIMIT}.")
+    return limit
+
+async def main(req: func.HttpRequest) -> func.HttpResponse:
+    query = (req.params.get('q') or '').strip()
+    if not query:
+        return func.HttpResponse("Please provide a search query, e.g. /api/searchmovies?q=dark knight", status_code=400)
+
+    try:
+        limit = parse_limit(req)
+        fields = projection.fields_param(req)
+    except ValueError as e:
+        return func.HttpResponse(str(e), status_code=400)
+
+    try:
+        results = await search.search(query, limit)
+    except cosmos.exceptions.CosmosHttpResponseError as e:
+        return func.HttpResponse("Error connecting to Cosmos DB: " + str(e), status_code=500)
+
+    body = [dict(movie, score=round(score, 3)) for score, movie in results]
+    return responses.respond(req, projection.project(body, fields + ("score",)))
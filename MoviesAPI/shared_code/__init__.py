@@ -0,0 +1,2 @@
+# Code shared by the MoviesAPI functions. Each function imports what it needs
+# with `from shared_code import ...`; the function app root is on sys.path.
@@ -0,0 +1,246 @@
+import asyncio
+import logging
+import os
+import time
+
+from . import cosmos
+
+# Per-worker copy of the movie catalog. GetMovies and GetMoviesByYear answer
+# from it instead of scanning the container on every request.
+#
+# A snapshot is reloaded when it is older than CATALOG_CACHE_TTL seconds. In
+# between, the container's change feed is checked at most every
+# CATALOG_FEED_POLL_SECONDS; an unchanged feed costs a single cheap read, and
+# the documents written since the last check are patched into a new snapshot
+# instead of re-querying the whole catalog. More than CATALOG_MAX_INCREMENTAL
+# changes at once trigger a full reload. Deletes do not show up in the feed
+# and are picked up by the TTL reload.
+CATALOG_FIELDS = ("id", "title", "releaseYear", "genre", "coverUrl")
+CATALOG_QUERY = "SELECT " + ", ".join(f"c.{field}" for field in CATALOG_FIELDS) + " FROM c"
+
+_lock = None
+_lock_loop = None
+_movies = None
+_loaded_at = 0.0
+_checked_at = 0.0
+_feed_token = None
+_container = None
+_derived = {}
+# Background builds of derived values, by builder
+_building = {}
+# (previous snapshot, current snapshot, changed documents) after a patch
+_patch = None
+# Every new snapshot gets the next generation. The current snapshot and the
+# current derived values are registered here by id(), so callers can key on a
+# version without holding on to the object; ids are dropped as soon as the
+# object is replaced, so a later object reusing the id is never mistaken for it.
+_generation = 0
+_versions = {}
+
+_stats = {"hits": 0, "loads": 0, "invalidations": 0, "patches": 0}
+
+
+def _ttl():
+    return float(os.getenv('CATALOG_CACHE_TTL', '300'))
+
+
+def _poll_interval():
+    return float(os.getenv('CATALOG_FEED_POLL_SECONDS', '5'))
+
+
+def _max_incremental():
+    return int(os.getenv('CATALOG_MAX_INCREMENTAL', '1000'))
+
+
+def _register(old, new, generation):
+    if old is not None:
+        _versions.pop(id(old), None)
+    if new is not None:
+        _versions[id(new)] = generation
+
+
+def _set_snapshot(movies):
+    global _movies, _generation
+    _generation += 1
+    _register(_movies, movies, _generation)
+    _movies = movies
+
+
+def version(value):
+    # Generation of the snapshot a current snapshot or derived value belongs
+    # to, or None for anything the cache no longer holds
+    return _versions.get(id(value))
+
+
+def _get_lock():
+    # asyncio locks belong to one event loop; make a new one if the loop changed
+    global _lock, _lock_loop
+    loop = asyncio.get_running_loop()
+    if _lock is None or _lock_loop is not loop:
+        _lock = asyncio.Lock()
+        _lock_loop = loop
+    return _lock
+
+
+async def _read_feed(container, continuation, limit=0):
+    # Returns up to limit + 1 documents written since `continuation`, and the
+    # token to resume from next time. Without a token the feed is opened at
+    # "now".
+    if continuation is None:
+        pages = container.query_items_change_feed(start_time="Now").by_page()
+    else:
+        pages = container.query_items_change_feed(continuation=continuation).by_page()
+
+    changes = []
+    async for page in pages:
+        async for doc in page:
+            changes.append(doc)
+            if len(changes) > limit:
+                break
+        if len(changes) > limit:
+            break
+    return changes, pages.continuation_token
+
+
+async def _load(container):
+    global _loaded_at, _checked_at, _feed_token, _patch
+
+    # Open the feed before reading, so a write that lands during the load is
+    # still seen on the next check.
+    _, token = await _read_feed(container, None)
+    movies = [movie async for movie in container.query_items(query=CATALOG_QUERY, enable_cross_partition_query=True)]
+
+    now = time.monotonic()
+    _set_snapshot(movies)
+    _loaded_at = now
+    _checked_at = now
+    _feed_token = token
+    _patch = None
+    _stats["loads"] += 1
+    logging.info('Loaded %d movies into the catalog cache.', len(movies))
+
+
+async def get_movies(container=None):
+    global _checked_at, _feed_token, _container
+
+    container = container or cosmos.get_async_container()
+    async with _get_lock():
+        now = time.monotonic()
+        if _movies is None or container is not _container or now - _loaded_at >= _ttl():
+            _container = container
+            await _load(container)
+        elif now - _checked_at >= _poll_interval():
+            changes, token = await _read_feed(container, _feed_token, _max_incremental())
+            _checked_at = now
+            if len(changes) > _max_incremental():
+                _stats["invalidations"] += 1
+                await _load(container)
+            elif changes:
+                _apply(changes)
+                _feed_token = token or _feed_token
+            else:
+                _feed_token = token or _feed_token
+                _stats["hits"] += 1
+        else:
+            _stats["hits"] += 1
+        return _movies
+
+
+def _apply(changes):
+    # Builds the next snapshot from the current one plus the changed documents.
+    # Snapshots are never modified in place, since callers may still hold one.
+    global _patch
+    updated = {doc["id"]: {field: doc[field] for field in CATALOG_FIELDS if field in doc} for doc in changes}
+    known = set()
+    movies = []
+    for movie in _movies:
+        known.add(movie["id"])
+        movies.append(updated.get(movie["id"], movie))
+    movies.extend(doc for movie_id, doc in updated.items() if movie_id not in known)
+
+    _patch = (_movies, movies, list(updated.values()))
+    _set_snapshot(movies)
+    _stats["patches"] += 1
+    logging.info('Patched %d changed movies into the catalog cache.', len(updated))
+
+
+async def derived(builder, container=None, update=None):
+    # Returns builder(movies) for the current snapshot, computed once per
+    # snapshot. Used for lookup structures that are derived from the catalog.
+    # When the snapshot was produced by patching the previous one, and
+    # `update` is given, update(previous_value, changed_docs) is used instead
+    # of rebuilding from scratch. It must return a new value, not modify the
+    # previous one.
+    #
+    # Full builds (after a load or TTL reload) can take seconds for a large
+    # catalog, so they run in a worker thread with asyncio.to_thread, and the
+    # value for the previous snapshot keeps being served until the new one is
+    # ready. Only the very first build has nothing to serve and is awaited.
+    movies = await get_movies(container)
+    entry = _derived.get(builder)
+    if entry is not None and entry[0] is movies:
+        return entry[1]
+    if update is not None and entry is not None and _patch is not None \
+            and _patch[0] is entry[0] and _patch[1] is movies:
+        previous = entry[1]
+        entry = (movies, update(previous, _patch[2]))
+        _derived[builder] = entry
+        _register(previous, entry[1], _generation)
+        return entry[1]
+
+    task = _start_build(builder, movies, _generation)
+    if entry is not None:
+        return entry[1]
+    return await asyncio.shield(task)
+
+
+def _start_build(builder, movies, generation):
+    # One background build per builder at a time; a build for an older
+    # snapshot is left to finish, and the next call starts one for the latest
+    build = _building.get(builder)
+    if build is not None and not build.done() and build.get_loop() is asyncio.get_running_loop():
+        return build
+
+    async def run():
+        started = time.monotonic()
+        try:
+            value = await asyncio.to_thread(builder, movies)
+        except Exception:
+            logging.exception('Could not build %s.%s for the catalog cache.', builder.__module__, builder.__name__)
+            raise
+        entry = _derived.get(builder)
+        if entry is None or entry[0] is not _movies:
+            _derived[builder] = (movies, value)
+            _register(entry[1] if entry is not None else None, value, generation)
+        logging.info('Built %s.%s for %d movies in %.2fs.', builder.__module__, builder.__name__,
+                     len(movies), time.monotonic() - started)
+        return value
+
+    build = _building[builder] = asyncio.ensure_future(run())
+    # A failed build that nobody awaited is already logged
+    build.add_done_callback(lambda done: done.cancelled() or done.exception())
+    return build
+
+
+def _index_by_id(movies):
+    return {movie["id"]: movie for movie in movies}
+
+
+def _update_index_by_id(index, changes):
+    index = dict(index)
+    index.update((movie["id"], movie) for movie in changes)
+    return index
+
+
+async def get_movie(movie_id, container=None):
+    return (await derived(_index_by_id, container, _update_index_by_id)).get(movie_id)
+
+
+def invalidate():
+    global _movies
+    _register(_movies, None, None)
+    _movies = None
+
+
+def cache_stats():
+    return dict(_stats)
@@ -0,0 +1,95 @@
+import gzip
+import os
+
+# Content-coding for response bodies. Bodies of at least COMPRESSION_MIN_BYTES
+# are compressed with the best coding the client accepts: brotli when the
+# brotli package is installed, otherwise gzip. Callers that cache a response
+# can pass a dict to keep the compressed forms, so a hot body is compressed
+# once per coding rather than on every request.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _settings():
+    return {
+        "min_bytes": int(os.getenv('COMPRESSION_MIN_BYTES', '1024')),
+        "gzip_level": int(os.getenv('COMPRESSION_GZIP_LEVEL', '6')),
+        "brotli_quality": int(os.getenv('COMPRESSION_BROTLI_QUALITY', '5')),
+    }
+
+
+def supported():
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def choose(req):
+    # Best supported coding allowed by Accept-Encoding, or None for identity
+    accepted = {}
+    for part in (req.headers.get("Accept-Encoding") or "").split(","):
+        coding, *params = [value.strip() for value in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if coding:
+            accepted[coding.lower()] = q
+
+    best = None
+    for coding in supported():
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > 0 and (best is None or q > best[0]):
+            best = (q, coding)
+    return best[1] if best else None
+
+
+def compress(body, coding, settings=None):
+    settings = settings or _settings()
+    if coding == "br":
+        return brotli.compress(body, quality=settings["brotli_quality"])
+    if coding == "gzip":
+        # mtime=0 keeps the output identical for identical input
+        return gzip.compress(body, compresslevel=settings["gzip_level"], mtime=0)
+    raise ValueError(f"Unsupported content coding: {coding}")
+
+
+def coding_for(req, body, settings=None):
+    # Coding negotiate() would use for this body, without compressing it
+    settings = settings or _settings()
+    if len(body) < settings["min_bytes"]:
+        return None
+    return choose(req)
+
+
+def encode(body, coding, cache=None, settings=None):
+    # Body in `coding` (None for as is); `cache` maps coding -> compressed
+    # bytes for a cached body.
+    if coding is None:
+        return body
+    if cache is not None and coding in cache:
+        return cache[coding]
+    compressed = compress(body, coding, settings)
+    if cache is not None:
+        cache[coding] = compressed
+    return compressed
+
+
+def negotiate(req, body, cache=None):
+    # Returns (coding, body) for this request; coding is None when the body is
+    # sent as is.
+    settings = _settings()
+    coding = coding_for(req, body, settings)
+    return coding, encode(body, coding, cache, settings)
+
+
+def vary(headers):
+    # Adds Accept-Encoding to the Vary header of a headers dict
+    values = [value.strip() for value in headers.get("Vary", "").split(",") if value.strip()]
+    if "Accept-Encoding" not in values:
+        values.append("Accept-Encoding")
+    headers["Vary"] = ", ".join(values)
+    return headers
@@ -0,0 +1,252 @@
+import contextvars
+import importlib
+import logging
+import os
+import threading
+
+from . import partitioning
+
+# One client per worker process. Building a CosmosClient costs a TLS handshake
+# and an account metadata fetch, so it is created on first use and then reused
+# by every function that runs in this worker.
+#
+# The functions are async and use the azure.cosmos.aio client; the synchronous
+# client is kept for the command-line tools.
+#
+# With COSMOS_BACKEND=local no account is contacted at all: every container is
+# an in-process local_cosmos.LocalContainer, the movies container is loaded
+# from LOCAL_COSMOS_DATA (movies.json by default), and requests are charged
+# simulated RUs and LOCAL_COSMOS_LATENCY_MS per partition touched. The sync
+# and async getters share the same local data.
+#
+# The Azure SDK, aiohttp and requests are imported when a client is first
+# built rather than when a function module is loaded, which keeps them off
+# the worker's import path. Handlers catch `cosmos.exceptions.<Error>`; the
+# except clause is only evaluated once an exception is raised, so it does not
+# import azure.cosmos either.
+BACKENDS = ("cosmos", "local")
+DEFAULT_LOCAL_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "movies.json")
+
+_lock = threading.Lock()
+_client = None
+_session = None
+_containers = {}
+_async_client = None
+_async_session = None
+_async_containers = {}
+_local_containers = {}
+
+# How many requests were served by clients that already existed (warm)
+# versus ones that had to be built for that request (cold). Each function
+# invocation runs in its own asyncio task, and so its own context; a request
+# is counted once however many containers it asks for.
+_stats = {"warm": 0, "cold": 0}
+_request = contextvars.ContextVar("cosmos_request", default=None)
+
+
+def _count(built):
+    state = _request.get()
+    if state is None:
+        state = "cold" if built else "warm"
+        _stats[state] += 1
+        _request.set(state)
+    elif built and state == "warm":
+        # A later call in the same request had to build something after all
+        _stats["warm"] -= 1
+        _stats["cold"] += 1
+        _request.set("cold")
+
+
+def _settings():
+    return {
+        "endpoint": os.environ['COSMOS_ENDPOINT'],
+        "key": os.environ['COSMOS_KEY'],
+        "database": os.getenv('COSMOS_DATABASE_ID', 'MoviesDatabase'),
+        "container": os.getenv('COSMOS_CONTAINER_ID', 'MoviesContainer'),
+        "pool_size": int(os.getenv('COSMOS_POOL_SIZE', '10')),
+    }
+
+
+def __getattr__(name):
+    # cosmos.exceptions is azure.cosmos.exceptions, imported on first access
+    if name == "exceptions":
+        return importlib.import_module("azure.cosmos.exceptions")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def backend():
+    value = os.getenv('COSMOS_BACKEND', 'cosmos').lower()
+    if value not in BACKENDS:
+        raise ValueError(f"COSMOS_BACKEND must be one of: {', '.join(BACKENDS)}.")
+    return value
+
+
+def _local_settings():
+    return {
+        "container": os.getenv('COSMOS_CONTAINER_ID', 'MoviesContainer'),
+        "data": os.getenv('LOCAL_COSMOS_DATA', DEFAULT_LOCAL_DATA),
+        "latency": float(os.getenv('LOCAL_COSMOS_LATENCY_MS', '0')) / 1000,
+        "partitions": int(os.getenv('LOCAL_COSMOS_PARTITIONS', '1')),
+    }
+
+
+def _local_container(container_id=None):
+    # One LocalContainer per id for the life of the worker. The movies
+    # container starts with the documents from LOCAL_COSMOS_DATA, laid out for
+    # the configured COSMOS_PARTITION_KEY; every other container starts empty.
+    from . import local_cosmos
+
+    settings = _local_settings()
+    container_id = container_id or settings["container"]
+    with _lock:
+        container = _local_containers.get(container_id)
+        if container is not None:
+            _count(False)
+            return container
+
+        items = []
+        key = None
+        if container_id == settings["container"]:
+            key = partitioning.layout()
+            items = [partitioning.prepare_document(doc, key) for doc in local_cosmos.load_items(settings["data"])]
+            logging.info(f"Loaded {len(items)} documents into the local {container_id} container.")
+        container = local_cosmos.LocalContainer(
+            items, container_id=container_id, partition_key_path=f"/{key or 'id'}",
+            physical_partitions=settings["partitions"], partition_latency=settings["latency"]
+        )
+        _local_containers[container_id] = container
+        _count(True)
+        return container
+
+
+def _build_client(settings):
+    import requests
+    from requests.adapters import HTTPAdapter
+    from azure.core.pipeline.transport import RequestsTransport
+    from azure.cosmos import CosmosClient
+
+    # Keep-alive connections are pooled on a single requests session that the
+    # SDK transport borrows instead of opening its own per client.
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=settings["pool_size"], pool_maxsize=settings["pool_size"])
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    transport = RequestsTransport(session=session, session_owner=False)
+    return CosmosClient(settings["endpoint"], settings["key"], transport=transport), session
+
+
+def get_client():
+    global _client, _session
+    client = _client
+    if client is not None:
+        _count(False)
+        return client
+
+    with _lock:
+        if _client is None:
+            logging.info('Creating Cosmos client for this worker.')
+            _client, _session = _build_client(_settings())
+            _count(True)
+        else:
+            # Another thread built it while we were waiting on the lock
+            _count(False)
+        return _client
+
+
+def _build_async_client(settings):
+    import aiohttp
+    from azure.core.pipeline.transport import AioHttpTransport
+    from azure.cosmos.aio import CosmosClient as AsyncCosmosClient
+
+    # Must run inside the worker's event loop, which owns the aiohttp session
+    connector = aiohttp.TCPConnector(limit=settings["pool_size"])
+    session = aiohttp.ClientSession(connector=connector)
+    transport = AioHttpTransport(session=session, session_owner=False)
+    return AsyncCosmosClient(settings["endpoint"], settings["key"], transport=transport), session
+
+
+def get_async_client():
+    # No lock needed: building the client does not await, so two coroutines on
+    # the same event loop can never both see it missing.
+    global _async_client, _async_session
+    if _async_client is not None:
+        _count(False)
+        return _async_client
+
+    logging.info('Creating async Cosmos client for this worker.')
+    _async_client, _async_session = _build_async_client(_settings())
+    _count(True)
+    return _async_client
+
+
+def get_async_container(container_id=None):
+    if backend() == "local":
+        # The wrapper is cached too, so callers can rely on container identity
+        from . import local_cosmos
+        local = _local_container(container_id)
+        container = _async_containers.get(local.id)
+        if container is None:
+            container = _async_containers.setdefault(local.id, local_cosmos.AsyncLocalContainer(local))
+        return container
+
+    client = get_async_client()
+    settings = _settings()
+    container_id = container_id or settings["container"]
+
+    container = _async_containers.get(container_id)
+    if container is None:
+        container = client.get_database_client(settings["database"]).get_container_client(container_id)
+        _async_containers[container_id] = container
+    return container
+
+
+def get_database():
+    return get_client().get_database_client(_settings()["database"])
+
+
+def get_container(container_id=None):
+    if backend() == "local":
+        return _local_container(container_id)
+
+    client = get_client()
+    settings = _settings()
+    container_id = container_id or settings["container"]
+
+    container = _containers.get(container_id)
+    if container is None:
+        container = client.get_database_client(settings["database"]).get_container_client(container_id)
+        _containers[container_id] = container
+    return container
+
+
+def client_stats():
+    return dict(_stats)
+
+
+async def close():
+    # Closes the clients, and the sessions they borrow, that this process
+    # actually built. Nothing to close for the local backend or when no
+    # request was made. Used by the command-line tools before they exit.
+    global _client, _session, _async_client, _async_session
+    if _async_client is not None:
+        await _async_client.close()
+        await _async_session.close()
+        _async_client = _async_session = None
+        _async_containers.clear()
+    if _client is not None:
+        _client.close()
+        _session.close()
+        _client = _session = None
+        _containers.clear()
+
+
+def reset_client():
+    # Drop the cached client, e.g. after a key rotation. The next call builds
+    # a fresh one and is counted as cold.
+    global _client, _session, _async_client, _async_session
+    with _lock:
+        _client = _session = None
+        _containers.clear()
+        _async_client = _async_session = None
+        _async_containers.clear()
+        _local_containers.clear()
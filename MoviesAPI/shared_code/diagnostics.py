@@ -0,0 +1,39 @@
+import logging
+import os
+import time
+
+from . import catalog_cache, cosmos, llm, responses, summaries
+
+# Per-worker counters (Cosmos client reuse, Mistral latency, coalesced summary
+# generations, cache hit rates) are logged by whichever invocation comes
+# along once STATS_LOG_INTERVAL_SECONDS (300 by default, 0 turns it off) have
+# passed since the last time, so every worker reports without a timer.
+_last_logged = time.monotonic()
+
+
+def _interval():
+    return float(os.getenv('STATS_LOG_INTERVAL_SECONDS', '300'))
+
+
+def collect(**extra):
+    # `extra` maps names to callables returning a dict, for counters that live
+    # in a function module, e.g. a SingleFlight's stats
+    stats = {
+        "cosmos_clients": cosmos.client_stats(),
+        "mistral": llm.latency_stats(),
+        "summary_generations": summaries.generation_stats(),
+        "catalog_cache": catalog_cache.cache_stats(),
+        "response_cache": responses.serialized_stats(),
+    }
+    stats.update((name, stats_fn()) for name, stats_fn in extra.items())
+    return stats
+
+
+def log_stats(**extra):
+    global _last_logged
+    interval = _interval()
+    now = time.monotonic()
+    if interval <= 0 or now - _last_logged < interval:
+        return
+    _last_logged = now
+    logging.info(f"Worker stats: {collect(**extra)}")
@@ -0,0 +1,113 @@
+from bisect import bisect_left, insort
+
+from . import catalog_cache
+
+# Genre lookups without scanning the catalog. `genre` is stored as a
+# comma-separated string ("Action, Crime, Drama"), so an inverted index maps
+# each normalized genre to the sorted ids of the movies that have it. The
+# index is derived from the catalog snapshot: built once per full load, and
+# updated for just the changed movies when the snapshot is patched from the
+# change feed.
+MATCH_MODES = ("all", "any")
+
+
+def normalize_genre(genre):
+    return " ".join(genre.split()).casefold()
+
+
+def split_genres(value):
+    # Distinct normalized genres of a movie's genre string, in order
+    genres = []
+    for genre in (value or "").split(","):
+        genre = normalize_genre(genre)
+        if genre and genre not in genres:
+            genres.append(genre)
+    return genres
+
+
+class GenreIndex:
+    def __init__(self, postings, genres_by_id, movies_by_id):
+        self.postings = postings          # genre -> sorted movie ids
+        self.genres_by_id = genres_by_id  # movie id -> its genres
+        self.movies_by_id = movies_by_id  # movie id -> movie
+
+    def ids(self, genres, match="all"):
+        # Sorted ids of movies with all (or any) of the given genres
+        lists = [self.postings.get(normalize_genre(genre), []) for genre in genres]
+        if not lists:
+            return []
+        if match == "any":
+            return sorted(set().union(*lists))
+
+        lists.sort(key=len)
+        ids = set(lists[0])
+        for postings in lists[1:]:
+            ids.intersection_update(postings)
+            if not ids:
+                break
+        return sorted(ids)
+
+    def movies(self, genres, match="all"):
+        return [self.movies_by_id[movie_id] for movie_id in self.ids(genres, match)]
+
+
+def build(movies):
+    postings = {}
+    genres_by_id = {}
+    movies_by_id = {}
+    for movie in movies:
+        genres = split_genres(movie.get("genre"))
+        genres_by_id[movie["id"]] = genres
+        movies_by_id[movie["id"]] = movie
+        for genre in genres:
+            postings.setdefault(genre, []).append(movie["id"])
+    for ids in postings.values():
+        ids.sort()
+    return GenreIndex(postings, genres_by_id, movies_by_id)
+
+
+def update(index, changes):
+    # New index with the changed movies moved between postings lists. Lists
+    # that are touched are copied first, so the previous index stays valid.
+    postings = dict(index.postings)
+    genres_by_id = dict(index.genres_by_id)
+    movies_by_id = dict(index.movies_by_id)
+    copied = set()
+
+    def writable(genre):
+        if genre not in copied:
+            postings[genre] = list(postings.get(genre, []))
+            copied.add(genre)
+        return postings[genre]
+
+    for movie in changes:
+        movie_id = movie["id"]
+        old = genres_by_id.get(movie_id, [])
+        new = split_genres(movie.get("genre"))
+        for genre in old:
+            if genre not in new:
+                ids = writable(genre)
+                position = bisect_left(ids, movie_id)
+                if position < len(ids) and ids[position] == movie_id:
+                    del ids[position]
+                if not ids:
+                    del postings[genre]
+                    copied.discard(genre)
+        for genre in new:
+            if genre not in old:
+                insort(writable(genre), movie_id)
+        genres_by_id[movie_id] = new
+        movies_by_id[movie_id] = movie
+    return GenreIndex(postings, genres_by_id, movies_by_id)
+
+
+async def get_index(container=None):
+    return await catalog_cache.derived(build, container, update)
+
+
+def parse_genres(value):
+    # "Action,Drama" -> ["action", "drama"]; raises ValueError when empty
+    genres = split_genres(value)
+    if not genres:
+        raise ValueError("Genre must be specified in the URL path, e.g., /getmoviesbygenre/Action,Drama")
+    return genres
@@ -0,0 +1,61 @@
+import hashlib
+import os
+
+import azure.functions as func
+
+from . import compression
+
+# Conditional-request support for the catalog endpoints. Every 200 response
+# carries a strong ETag (a hash of the exact body bytes) and a Cache-Control
+# header; a request whose If-None-Match lists the current ETag gets an empty
+# 304 instead of the body.
+#
+# Cache-Control is set per endpoint with CACHE_CONTROL_<ENDPOINT>, e.g.
+# CACHE_CONTROL_GETMOVIES="public, max-age=300, stale-while-revalidate=3600".
+DEFAULT_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+
+
+def cache_control(endpoint):
+    return os.getenv(f"CACHE_CONTROL_{endpoint.upper()}", DEFAULT_CACHE_CONTROL)
+
+
+def etag_for(body):
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def matches(req, *etags):
+    header = req.headers.get("If-None-Match")
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return "*" in candidates or any(value.removeprefix("W/") in etags for value in candidates)
+
+
+def _coded_etag(etag, coding):
+    # Each content coding is a different representation, so it gets its own tag
+    return etag if coding is None else etag[:-1] + f"-{coding}" + '"'
+
+
+def respond(req, body, mimetype, endpoint, etag=None, headers=None, compressed=None):
+    # 200 with validators, or 304 when the client already has this body.
+    # Large bodies are compressed per Accept-Encoding; `compressed` lets a
+    # caller that caches the body keep its compressed forms too.
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    etag = etag or etag_for(body)
+    # Only the coding is needed for the validator; the body is compressed
+    # once we know a 200 is going out
+    coding = compression.coding_for(req, body)
+
+    headers = compression.vary(dict(headers or {}))
+    headers["ETag"] = _coded_etag(etag, coding)
+    headers["Cache-Control"] = cache_control(endpoint)
+    if matches(req, etag, headers["ETag"]):
+        return func.HttpResponse(status_code=304, headers=headers)
+    payload = compression.encode(body, coding, compressed)
+    if coding is not None:
+        headers["Content-Encoding"] = coding
+    return func.HttpResponse(body=payload, status_code=200, mimetype=mimetype, headers=headers)
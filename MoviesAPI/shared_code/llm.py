@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import deque
+
+# Async client for the Mistral chat completions API shared by every function
+# in the worker. Connections are kept alive in a pooled aiohttp session, each
+# attempt is bounded by connect/read timeouts and by MISTRAL_ATTEMPT_TIMEOUT
+# overall, and 429/5xx responses are retried a few times with jittered
+# exponential backoff. MISTRAL_DEADLINE_SECONDS caps a whole call, retries and
+# backoff included. aiohttp is imported on first use, not when the module
+# loads.
+#
+# MISTRAL_BASE_URL points the client somewhere other than api.mistral.ai,
+# e.g. the local stand-in in tools/mock_mistral.py for load tests.
+DEFAULT_BASE_URL = "https://api.mistral.ai"
+COMPLETIONS_PATH = "/v1/chat/completions"
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    pass
+
+
+_session = None
+_session_loop = None
+
+# Latency in seconds of recent calls, including retries and backoff
+_latencies = deque(maxlen=1000)
+_stats = {"calls": 0, "retries": 0, "failures": 0}
+
+
+def _settings():
+    return {
+        "api_key": os.getenv('mistral_api_key'),
+        "url": os.getenv('MISTRAL_BASE_URL', DEFAULT_BASE_URL).rstrip("/") + COMPLETIONS_PATH,
+        "connect_timeout": float(os.getenv('MISTRAL_CONNECT_TIMEOUT', '3.05')),
+        "read_timeout": float(os.getenv('MISTRAL_READ_TIMEOUT', '30')),
+        "attempt_timeout": float(os.getenv('MISTRAL_ATTEMPT_TIMEOUT', '30')),
+        "deadline": float(os.getenv('MISTRAL_DEADLINE_SECONDS', '60')),
+        "max_retries": int(os.getenv('MISTRAL_MAX_RETRIES', '3')),
+        "backoff": float(os.getenv('MISTRAL_BACKOFF_SECONDS', '0.5')),
+        "max_backoff": float(os.getenv('MISTRAL_MAX_BACKOFF_SECONDS', '8')),
+        "pool_size": int(os.getenv('MISTRAL_POOL_SIZE', '10')),
+    }
+
+
+def get_session():
+    # Created on first use inside the worker's event loop (and again if the loop
+    # changes). Building it does not await, so no lock is needed.
+    global _session, _session_loop
+    import aiohttp
+
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        settings = _settings()
+        _session_loop = loop
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=settings["pool_size"]),
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=settings["connect_timeout"],
+                                          sock_read=settings["read_timeout"])
+        )
+    return _session
+
+
+def _backoff(attempt, response, settings):
+    # Honour Retry-After when the server sends one, otherwise use full jitter
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), settings["max_backoff"])
+        except ValueError:
+            pass
+    return random.uniform(0, min(settings["max_backoff"], settings["backoff"] * 2 ** attempt))
+
+
+async def post(payload):
+    # Sends one completions request, retrying transient failures, and returns
+    # the successful aiohttp response; the caller must read or release it.
+    # Raises LLMError when it gives up.
+    import aiohttp
+
+    settings = _settings()
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {settings['api_key']}"
+    }
+    session = get_session()
+
+    started = time.perf_counter()
+    deadline = started + settings["deadline"]
+    _stats["calls"] += 1
+    try:
+        for attempt in range(settings["max_retries"] + 1):
+            response = None
+            # The total covers reading the body too, and never runs past the deadline
+            timeout = aiohttp.ClientTimeout(total=min(settings["attempt_timeout"], deadline - time.perf_counter()),
+                                            sock_connect=settings["connect_timeout"],
+                                            sock_read=settings["read_timeout"])
+            try:
+                response = await session.post(settings["url"], headers=headers, json=payload, timeout=timeout)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = f"{type(e).__name__}: {str(e)}"
+            else:
+                if response.status < 400:
+                    return response
+                error = f"HTTP {response.status}: {(await response.text())[:200]}"
+                response.release()
+                if response.status not in RETRY_STATUSES:
+                    break
+
+            if attempt == settings["max_retries"]:
+                break
+            delay = _backoff(attempt, response, settings)
+            if time.perf_counter() + delay >= deadline:
+                error += f"; giving up at the {settings['deadline']:g}s deadline"
+                break
+            _stats["retries"] += 1
+            logging.warning(f"Mistral call failed ({error}); retrying in {delay:.2f}s.")
+            await asyncio.sleep(delay)
+
+        _stats["failures"] += 1
+        raise LLMError(f"Mistral completion failed: {error}")
+    finally:
+        _latencies.append(time.perf_counter() - started)
+
+
+async def complete(prompt, model, max_tokens=200, temperature=0.7):
+    # Returns the text of a single, non-streamed chat completion.
+    payload = {
+        "model": model,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": temperature,
+        "top_p": 1,
+        "max_tokens": max_tokens,
+        "stream": False,
+        "safe_prompt": False
+    }
+    import aiohttp
+
+    response = await post(payload)
+    try:
+        data = await response.json(content_type=None)
+        return data['choices'][0]['message']['content']
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, KeyError, IndexError, TypeError) as e:
+        raise LLMError(f"Unexpected Mistral response: {str(e)}")
+    finally:
+        response.release()
+
+
+def latency_stats():
+    # Call counters plus p50/p95/max latency in milliseconds over recent calls
+    stats = dict(_stats)
+    samples = sorted(_latencies)
+    if samples:
+        stats["p50_ms"] = samples[len(samples) // 2] * 1000
+        stats["p95_ms"] = samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000
+        stats["max_ms"] = samples[-1] * 1000
+    return stats
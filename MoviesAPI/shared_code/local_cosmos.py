@@ -0,0 +1,494 @@
+import asyncio
+import copy
+import json
+import re
+import threading
+import time
+import uuid
+
+from azure.core.async_paging import AsyncItemPaged, AsyncList
+from azure.core.paging import ItemPaged
+from azure.cosmos import exceptions
+
+# In-process stand-in for the parts of the Cosmos container API the functions
+# use. It understands the small SQL subset our queries are written in:
+#
+#   SELECT [VALUE] * | c | c.a, c.b FROM c
+#       [WHERE <cond> [AND|OR <cond>] ...]
+#       [ORDER BY c.field [ASC|DESC]]
+#
+# where <cond> is `c.field <op> @param|literal`, `c.field IN (...)`,
+# `[NOT] IS_DEFINED(c.field)` or a parenthesised condition.
+
+_TOKEN = re.compile(r"""\s*(?:
+    (?P<string>"[^"]*"|'[^']*')
+  | (?P<number>-?\d+(?:\.\d+)?)
+  | (?P<param>@\w+)
+  | (?P<op><=|>=|!=|<>|=|<|>)
+  | (?P<punct>[(),*])
+  | (?P<name>[A-Za-z_][\w.]*)
+)""", re.VERBOSE)
+
+
+def _tokenize(query):
+    tokens = []
+    pos = 0
+    query = query.strip()
+    while pos < len(query):
+        match = _TOKEN.match(query, pos)
+        if not match:
+            raise ValueError(f"Unsupported query syntax near: {query[pos:]!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        pos = match.end()
+    return tokens
+
+
+def _field(doc, path):
+    # "c.title" -> doc["title"]; returns _MISSING when the property is absent
+    value = doc
+    for part in path.split(".")[1:]:
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+_MISSING = object()
+
+# Simulated request-unit prices, roughly what Cosmos charges for ~1 KB items
+_POINT_READ_CHARGE = 1.0
+_WRITE_CHARGE = 6.0
+_QUERY_PARTITION_CHARGE = 2.5
+_QUERY_ITEM_CHARGE = 0.05
+
+_COMPARE = {
+    "=": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<>": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    ">": lambda a, b: a > b,
+    "<=": lambda a, b: a <= b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+class _Query:
+    def __init__(self, query, parameters):
+        self.tokens = _tokenize(query)
+        self.pos = 0
+        self.params = {p["name"]: p["value"] for p in (parameters or [])}
+        self.value = False
+        self.projection = None
+        self.where = None
+        self.order_by = None
+        self._parse()
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _next(self):
+        token = self._peek()
+        self.pos += 1
+        return token
+
+    def _keyword(self, word):
+        kind, text = self._peek()
+        if kind == "name" and text.upper() == word:
+            self.pos += 1
+            return True
+        return False
+
+    def _expect(self, text):
+        kind, got = self._next()
+        if got is None or got.upper() != text:
+            raise ValueError(f"Expected {text!r} in query, got {got!r}")
+
+    def _parse(self):
+        self._expect("SELECT")
+        self.value = self._keyword("VALUE")
+        kind, text = self._peek()
+        if text == "*" or (kind == "name" and text == "c"):
+            self.pos += 1
+        else:
+            self.projection = []
+            while True:
+                kind, text = self._next()
+                if kind != "name" or not text.startswith("c."):
+                    raise ValueError(f"Unsupported projection: {text!r}")
+                self.projection.append(text)
+                if self._peek()[1] != ",":
+                    break
+                self.pos += 1
+        self._expect("FROM")
+        self._expect("C")
+        if self._keyword("WHERE"):
+            self.where = self._or()
+        if self._keyword("ORDER"):
+            self._expect("BY")
+            kind, text = self._next()
+            descending = self._keyword("DESC")
+            if not descending:
+                self._keyword("ASC")
+            self.order_by = (text, descending)
+        if self.pos != len(self.tokens):
+            raise ValueError(f"Unsupported query syntax near: {self._peek()[1]!r}")
+
+    def _or(self):
+        left = self._and()
+        while self._keyword("OR"):
+            right = self._and()
+            left = (lambda l, r: lambda doc: l(doc) or r(doc))(left, right)
+        return left
+
+    def _and(self):
+        left = self._term()
+        while self._keyword("AND"):
+            right = self._term()
+            left = (lambda l, r: lambda doc: l(doc) and r(doc))(left, right)
+        return left
+
+    def _operand(self):
+        kind, text = self._next()
+        if kind == "param":
+            if text not in self.params:
+                raise ValueError(f"Missing value for query parameter {text}")
+            return self.params[text]
+        if kind == "string":
+            return text[1:-1]
+        if kind == "number":
+            return float(text) if "." in text else int(text)
+        if kind == "name" and text.lower() in ("true", "false"):
+            return text.lower() == "true"
+        raise ValueError(f"Unsupported operand: {text!r}")
+
+    def _term(self):
+        if self._keyword("NOT"):
+            inner = self._term()
+            return lambda doc: not inner(doc)
+        if self._peek()[1] == "(":
+            self.pos += 1
+            inner = self._or()
+            self._expect(")")
+            return inner
+        if self._keyword("IS_DEFINED"):
+            self._expect("(")
+            path = self._next()[1]
+            self._expect(")")
+            return lambda doc: _field(doc, path) is not _MISSING
+
+        kind, path = self._next()
+        if kind != "name" or not path.startswith("c."):
+            raise ValueError(f"Unsupported condition near: {path!r}")
+        if self._keyword("IN"):
+            self._expect("(")
+            values = [self._operand()]
+            while self._peek()[1] == ",":
+                self.pos += 1
+                values.append(self._operand())
+            self._expect(")")
+            return lambda doc: _field(doc, path) in values
+
+        kind, op = self._next()
+        if kind != "op":
+            raise ValueError(f"Unsupported operator: {op!r}")
+        operand = self._operand()
+        compare = _COMPARE[op]
+
+        def match(doc):
+            value = _field(doc, path)
+            if value is _MISSING:
+                return False
+            try:
+                return compare(value, operand)
+            except TypeError:
+                return False
+        return match
+
+    def run(self, docs):
+        rows = [doc for doc in docs if self.where is None or self.where(doc)]
+        if self.order_by:
+            path, descending = self.order_by
+            # Like Cosmos, documents without the property sort lowest
+            rows.sort(key=lambda doc: (_field(doc, path) is not _MISSING, _field(doc, path)), reverse=descending)
+        if self.projection is None:
+            return [copy.deepcopy(doc) for doc in rows]
+        if self.value:
+            return [copy.deepcopy(_field(doc, self.projection[0])) for doc in rows]
+        result = []
+        for doc in rows:
+            item = {}
+            for path in self.projection:
+                value = _field(doc, path)
+                if value is not _MISSING:
+                    item[path.rsplit(".", 1)[1]] = copy.deepcopy(value)
+            result.append(item)
+        return result
+
+
+class _ChangeFeedPages:
+    # Mirrors the SDK change feed page iterator: iteration stops once there are
+    # no further changes, and continuation_token still holds the position to
+    # resume from on the next call.
+    def __init__(self, container, start, page_size):
+        self._container = container
+        self._page_size = page_size
+        self.continuation_token = str(start)
+
+    def _next_page(self):
+        page, delay = self._container._read_changes(int(self.continuation_token), self._page_size)
+        if page:
+            self.continuation_token = str(page[-1]["_lsn"])
+        return page, delay
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        page, delay = self._next_page()
+        _sleep(delay)
+        if not page:
+            raise StopIteration
+        return iter(page)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        page, delay = self._next_page()
+        await _async_sleep(delay)
+        if not page:
+            raise StopAsyncIteration
+        return AsyncList(page)
+
+
+class _ChangeFeed:
+    def __init__(self, container, start, page_size):
+        self._container = container
+        self._start = start
+        self._page_size = page_size
+
+    def __iter__(self):
+        for page in self.by_page():
+            yield from page
+
+    async def __aiter__(self):
+        async for page in self.by_page():
+            async for item in page:
+                yield item
+
+    def by_page(self, continuation_token=None):
+        start = self._start if continuation_token is None else int(continuation_token)
+        return _ChangeFeedPages(self._container, start, self._page_size)
+
+
+def load_items(path):
+    # Documents from a JSON array file or a newline-delimited JSON file
+    with open(path, encoding="utf-8") as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == "[":
+            return json.load(f)
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _sleep(delay):
+    if delay:
+        time.sleep(delay)
+
+
+async def _async_sleep(delay):
+    if delay:
+        await asyncio.sleep(delay)
+
+
+class LocalContainer:
+    # Documents are assigned to logical partitions by the value at
+    # `partition_key_path`. Queries scoped with partition_key= touch one
+    # physical partition; anything else fans out to all `physical_partitions`.
+    # Every request adds simulated request units to `request_charge` and waits
+    # `partition_latency` seconds per partition it touches.
+    #
+    # The methods mirror the synchronous SDK; AsyncLocalContainer wraps the
+    # same data with the azure.cosmos.aio signatures.
+    def __init__(self, items=None, container_id="MoviesContainer", partition_key_path="/id",
+                 physical_partitions=1, partition_latency=0.0):
+        self.id = container_id
+        self.partition_key_path = partition_key_path
+        self.physical_partitions = physical_partitions
+        self.partition_latency = partition_latency
+        self.request_charge = 0.0
+        self._lock = threading.Lock()
+        self._docs = {}
+        self._lsn = 0
+        for item in items or []:
+            self._upsert(item)
+        # Seeding the container is not a request; start the meter at zero
+        self.request_charge = 0.0
+
+    def _charge(self, request_units, partitions=1):
+        # Records the charge and returns the simulated latency for the request
+        with self._lock:
+            self.request_charge += request_units
+        return self.partition_latency * partitions
+
+    def _partition_value(self, doc):
+        return _field(doc, "c" + self.partition_key_path.replace("/", "."))
+
+    def _get(self, item, partition_key):
+        doc = self._docs.get(item)
+        if doc is None or (partition_key is not None and self._partition_value(doc) != partition_key):
+            raise exceptions.CosmosResourceNotFoundError(message=f"Item {item} not found")
+        return doc
+
+    def _read_changes(self, lsn, page_size):
+        delay = self._charge(_POINT_READ_CHARGE, self.physical_partitions)
+        with self._lock:
+            changed = sorted((doc for doc in self._docs.values() if doc["_lsn"] > lsn), key=lambda doc: doc["_lsn"])
+        changed = changed[:page_size] if page_size else changed
+        return copy.deepcopy(changed), delay
+
+    def _upsert(self, body):
+        doc = copy.deepcopy(body)
+        doc.setdefault("id", str(uuid.uuid4()))
+        delay = self._charge(_WRITE_CHARGE)
+        with self._lock:
+            self._lsn += 1
+            doc["_lsn"] = self._lsn
+            doc["_ts"] = int(time.time())
+            doc["_etag"] = f'"{uuid.uuid4()}"'
+            self._docs[doc["id"]] = doc
+        return copy.deepcopy(doc), delay
+
+    def _read(self, item, partition_key):
+        delay = self._charge(_POINT_READ_CHARGE)
+        with self._lock:
+            return copy.deepcopy(self._get(item, partition_key)), delay
+
+    def _delete(self, item, partition_key):
+        delay = self._charge(_WRITE_CHARGE)
+        with self._lock:
+            self._get(item, partition_key)
+            del self._docs[item]
+        return None, delay
+
+    def _query_pages(self, query, parameters, max_item_count, partition_key):
+        # Returns (get_next, extract_data) callables in the shape azure.core
+        # paging expects; get_next also returns the simulated latency.
+        parsed = _Query(query, parameters)
+        with self._lock:
+            docs = list(self._docs.values())
+        if partition_key is not None:
+            docs = [doc for doc in docs if self._partition_value(doc) == partition_key]
+            partitions = 1
+        else:
+            partitions = self.physical_partitions
+        rows = parsed.run(docs)
+        page_size = max_item_count or len(rows) or 1
+
+        def get_next(continuation):
+            try:
+                start = int(continuation or 0)
+            except ValueError:
+                raise exceptions.CosmosHttpResponseError(status_code=400, message="Invalid continuation token.")
+            page = rows[start:start + page_size]
+            delay = self._charge(_QUERY_PARTITION_CHARGE * partitions + _QUERY_ITEM_CHARGE * len(page), partitions)
+            return (start, page), delay
+
+        def extract_data(response):
+            start, page = response
+            end = start + len(page)
+            return (str(end) if end < len(rows) else None), page
+
+        return get_next, extract_data
+
+    def _change_feed(self, start_time, continuation, max_item_count):
+        if continuation is not None:
+            start = int(continuation)
+        elif start_time == "Beginning":
+            start = 0
+        else:
+            start = self._lsn
+        return _ChangeFeed(self, start, max_item_count)
+
+    def _properties(self):
+        return {"id": self.id, "partitionKey": {"paths": [self.partition_key_path], "kind": "Hash"}}
+
+    def read(self, **kwargs):
+        _sleep(self._charge(_POINT_READ_CHARGE))
+        return self._properties()
+
+    def upsert_item(self, body, **kwargs):
+        doc, delay = self._upsert(body)
+        _sleep(delay)
+        return doc
+
+    def read_item(self, item, partition_key=None, **kwargs):
+        doc, delay = self._read(item, partition_key)
+        _sleep(delay)
+        return doc
+
+    def delete_item(self, item, partition_key=None, **kwargs):
+        _, delay = self._delete(item, partition_key)
+        _sleep(delay)
+
+    def query_items(self, query, parameters=None, max_item_count=None, partition_key=None, **kwargs):
+        get_next, extract_data = self._query_pages(query, parameters, max_item_count, partition_key)
+
+        def fetch(continuation):
+            response, delay = get_next(continuation)
+            _sleep(delay)
+            return response
+
+        return ItemPaged(fetch, extract_data)
+
+    def query_items_change_feed(self, start_time="Now", continuation=None, max_item_count=None, **kwargs):
+        return self._change_feed(start_time, continuation, max_item_count)
+
+
+class AsyncLocalContainer:
+    # azure.cosmos.aio flavoured view of a LocalContainer
+    def __init__(self, container=None, **kwargs):
+        self.sync = container if container is not None else LocalContainer(**kwargs)
+        self.id = self.sync.id
+
+    @property
+    def request_charge(self):
+        return self.sync.request_charge
+
+    async def read(self, **kwargs):
+        await _async_sleep(self.sync._charge(_POINT_READ_CHARGE))
+        return self.sync._properties()
+
+    async def upsert_item(self, body, **kwargs):
+        doc, delay = self.sync._upsert(body)
+        await _async_sleep(delay)
+        return doc
+
+    async def read_item(self, item, partition_key=None, **kwargs):
+        doc, delay = self.sync._read(item, partition_key)
+        await _async_sleep(delay)
+        return doc
+
+    async def delete_item(self, item, partition_key=None, **kwargs):
+        _, delay = self.sync._delete(item, partition_key)
+        await _async_sleep(delay)
+
+    def query_items(self, query, parameters=None, max_item_count=None, partition_key=None, **kwargs):
+        get_next, extract_data = self.sync._query_pages(query, parameters, max_item_count, partition_key)
+
+        async def fetch(continuation):
+            response, delay = get_next(continuation)
+            await _async_sleep(delay)
+            return response
+
+        async def extract(response):
+            token, page = extract_data(response)
+            return token, AsyncList(page)
+
+        return AsyncItemPaged(fetch, extract)
+
+    def query_items_change_feed(self, start_time="Now", continuation=None, max_item_count=None, **kwargs):
+        return self.sync._change_feed(start_time, continuation, max_item_count)
@@ -0,0 +1,78 @@
+import base64
+import binascii
+
+from . import cosmos
+
+# Continuation-token pagination for the catalog endpoints.
+#
+# Clients pass ?pageSize=N (and ?continuation=<token> for every page after the
+# first). Each request reads exactly one Cosmos page, so memory and latency per
+# request stay bounded however large the catalog is. The Cosmos continuation
+# token is wrapped in URL-safe base64 so clients treat it as opaque.
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_token(token):
+    if token is None:
+        return None
+    return base64.urlsafe_b64encode(token.encode("utf-8")).decode("ascii")
+
+
+def decode_token(token):
+    try:
+        decoded = base64.b64decode(token.encode("ascii"), altchars=b"-_", validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeError, ValueError):
+        decoded = None
+    if not decoded:
+        raise ValueError("Invalid continuation token.")
+    return decoded
+
+
+def page_params(req):
+    # Returns (page_size, cosmos_continuation), or None when the request did
+    # not ask for paging. Raises ValueError for malformed parameters.
+    page_size = req.params.get('pageSize')
+    continuation = req.params.get('continuation')
+    if page_size is None and continuation is None:
+        return None
+
+    if page_size is None:
+        page_size = DEFAULT_PAGE_SIZE
+    else:
+        try:
+            page_size = int(page_size)
+        except ValueError:
+            raise ValueError("pageSize must be a whole number.")
+        if not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise ValueError(f"pageSize must be between 1 and {MAX_PAGE_SIZE}.")
+
+    if continuation is not None:
+        continuation = decode_token(continuation)
+    return page_size, continuation
+
+
+async def query_page(container, query, page_size, continuation=None, parameters=None, **options):
+    # Reads a single page of results and returns it with the opaque token for
+    # the next page (None on the last page). `options` are passed through to
+    # query_items, e.g. a partition_key to avoid a cross-partition query.
+    # Raises ValueError when Cosmos rejects the continuation token.
+    options = options or {"enable_cross_partition_query": True}
+    pages = container.query_items(
+        query=query,
+        parameters=parameters,
+        max_item_count=page_size,
+        **options
+    ).by_page(continuation)
+
+    try:
+        page = await pages.__anext__()
+    except StopAsyncIteration:
+        return [], None
+    except cosmos.exceptions.CosmosHttpResponseError as e:
+        # An expired token, or one from a different query, is answered with 400
+        if continuation is not None and e.status_code == 400:
+            raise ValueError("Invalid continuation token.")
+        raise
+    items = [item async for item in page]
+    return items, encode_token(pages.continuation_token)
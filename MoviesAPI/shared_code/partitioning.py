@@ -0,0 +1,77 @@
+import os
+
+# Partition layout of the movies container.
+#
+# COSMOS_PARTITION_KEY selects how by-year lookups are routed:
+#   unset         legacy container; by-year queries fan out to every partition
+#   releaseYear   container partitioned on /releaseYear
+#   yearBucket    container partitioned on /yearBucket, a derived range of
+#                 YEAR_BUCKET_SIZE years such as "2010-2019"
+#
+# In both partitioned layouts a by-year lookup is a single-partition query.
+# A legacy container may be partitioned on any path; code that needs the key
+# of a document reads the path from the container's properties with
+# key_path() and takes the value from the document with key_value().
+RELEASE_YEAR = "releaseYear"
+YEAR_BUCKET = "yearBucket"
+LAYOUTS = (RELEASE_YEAR, YEAR_BUCKET)
+
+
+def layout():
+    value = os.getenv('COSMOS_PARTITION_KEY') or None
+    if value is not None and value not in LAYOUTS:
+        raise ValueError(f"COSMOS_PARTITION_KEY must be one of: {', '.join(LAYOUTS)}.")
+    return value
+
+
+def bucket_size():
+    return int(os.getenv('YEAR_BUCKET_SIZE', '10'))
+
+
+def year_bucket(year, size=None):
+    size = size or bucket_size()
+    try:
+        start = int(year) // size * size
+    except ValueError:
+        raise ValueError("Year must be a number, e.g. 2010.")
+    return f"{start}-{start + size - 1}"
+
+
+def partition_key_for_year(year, key=None, size=None):
+    key = key if key is not None else layout()
+    if key == RELEASE_YEAR:
+        return str(year)
+    if key == YEAR_BUCKET:
+        return year_bucket(year, size)
+    return None
+
+
+def year_query_options(year):
+    # Keyword arguments for container.query_items() that route a by-year query
+    # to its single partition when the layout allows it.
+    partition_key = partition_key_for_year(year)
+    if partition_key is None:
+        return {"enable_cross_partition_query": True}
+    return {"partition_key": partition_key}
+
+
+def prepare_document(doc, key, size=None):
+    # Adds the derived partition key property a document needs in `key` layout.
+    if key == YEAR_BUCKET:
+        doc[YEAR_BUCKET] = year_bucket(doc["releaseYear"], size)
+    return doc
+
+
+def key_path(properties):
+    # Partition key path, e.g. "/id", from container.read() properties
+    return properties["partitionKey"]["paths"][0]
+
+
+def key_value(doc, path):
+    # Value at a partition key path such as "/id" or "/meta/region", or None
+    value = doc
+    for name in path.strip("/").split("/"):
+        if not isinstance(value, dict) or name not in value:
+            return None
+        value = value[name]
+    return value
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import os
+import time
+
+from . import cosmos, llm, summaries
+
+# Bulk backfill of movie summaries, run by the PresummarizeMovies timer and by
+# tools/presummarize.py. Each run walks the movies container one page at a
+# time, generates summaries for the movies that have no fresh one, and writes
+# them back together. The query continuation token is saved in a checkpoint
+# document after every page, so a large catalog is covered across several
+# runs that each stop within their time budget.
+CHECKPOINT_ID = "checkpoint.presummarize"
+QUERY = "SELECT c.id, c.title, c.releaseYear, c.genre, c.coverUrl FROM c"
+
+
+def _settings():
+    return {
+        "page_size": int(os.getenv('PRESUMMARIZE_PAGE_SIZE', '100')),
+        "concurrency": int(os.getenv('PRESUMMARIZE_CONCURRENCY', '4')),
+        "rate": float(os.getenv('PRESUMMARIZE_RATE_PER_SECOND', '2')),
+        "time_budget": float(os.getenv('PRESUMMARIZE_TIME_BUDGET_SECONDS', '240')),
+    }
+
+
+class RateLimiter:
+    # Spaces calls at least 1/rate seconds apart across all concurrent callers
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def load_checkpoint(container):
+    try:
+        doc = await container.read_item(item=CHECKPOINT_ID, partition_key=CHECKPOINT_ID)
+    except cosmos.exceptions.CosmosResourceNotFoundError:
+        return None
+    return doc.get("continuation")
+
+
+async def save_checkpoint(container, continuation):
+    await container.upsert_item({
+        "id": CHECKPOINT_ID,
+        "continuation": continuation,
+        "updatedAt": int(time.time()),
+    })
+
+
+async def _summarize_page(movies, summaries_container, limiter, semaphore, stats):
+    cached = await summaries.get_cached_many(movies, container=summaries_container)
+    missing = [movie for movie in movies if summaries.summary_id(movie) not in cached]
+
+    async def generate(movie):
+        async with semaphore:
+            await limiter.wait()
+            return await llm.complete(summaries.build_prompt(movie), summaries.MODEL)
+
+    results = await asyncio.gather(*(generate(movie) for movie in missing), return_exceptions=True)
+
+    generated = []
+    for movie, result in zip(missing, results):
+        if isinstance(result, Exception):
+            logging.warning(f"Could not summarize {movie['title']}: {str(result)}")
+            stats["failed"] += 1
+        else:
+            generated.append((movie, result))
+
+    await asyncio.gather(*(summaries.store(movie, summary, container=summaries_container)
+                           for movie, summary in generated))
+    stats["scanned"] += len(movies)
+    stats["generated"] += len(generated)
+
+
+async def run(movies_container=None, summaries_container=None, time_budget=None):
+    # Processes pages until the catalog is done or the time budget runs out.
+    # Returns counters; "complete" tells whether the pass reached the end.
+    settings = _settings()
+    time_budget = settings["time_budget"] if time_budget is None else time_budget
+    movies_container = movies_container or cosmos.get_async_container()
+    summaries_container = summaries_container or summaries._container()
+
+    started = time.monotonic()
+    stats = {"scanned": 0, "generated": 0, "failed": 0, "complete": False}
+    limiter = RateLimiter(settings["rate"])
+    semaphore = asyncio.Semaphore(settings["concurrency"])
+
+    async def walk(continuation):
+        # True when the pass reached the end of the catalog
+        pages = movies_container.query_items(
+            query=QUERY,
+            enable_cross_partition_query=True,
+            max_item_count=settings["page_size"]
+        ).by_page(continuation)
+
+        async for page in pages:
+            movies = [movie async for movie in page]
+            await _summarize_page(movies, summaries_container, limiter, semaphore, stats)
+
+            # None means the pass is finished and the next run starts over
+            await save_checkpoint(summaries_container, pages.continuation_token)
+            if pages.continuation_token is None:
+                return True
+            if time.monotonic() - started >= time_budget:
+                return False
+        await save_checkpoint(summaries_container, None)
+        return True
+
+    continuation = await load_checkpoint(summaries_container)
+    if continuation:
+        logging.info('Resuming summary backfill from checkpoint.')
+
+    try:
+        stats["complete"] = await walk(continuation)
+    except cosmos.exceptions.CosmosHttpResponseError as e:
+        # A token that has expired or no longer fits the container is rejected
+        # with 400 before the first page; start a new pass instead of failing
+        # every run from now on.
+        if not continuation or e.status_code != 400 or stats["scanned"]:
+            raise
+        logging.warning(f"Summary backfill checkpoint was rejected, starting a new pass: {str(e)}")
+        await save_checkpoint(summaries_container, None)
+        stats["complete"] = await walk(None)
+
+    logging.info(f"Summary backfill: {stats}")
+    return stats
@@ -0,0 +1,44 @@
+# Field projection for the catalog endpoints.
+#
+# Clients pass ?fields=title,releaseYear to get only those properties. The
+# names are checked against ALLOWED_FIELDS and then become the SELECT list of
+# the Cosmos query, so a titles-only listing reads and returns less per
+# document. The allow-list is also what makes it safe to put the names into
+# the query text. Results served from the catalog cache are trimmed the same
+# way in memory.
+ALLOWED_FIELDS = ("id", "title", "releaseYear", "genre", "coverUrl")
+DEFAULT_FIELDS = ("title", "releaseYear", "genre", "coverUrl")
+
+
+def fields_param(req, default=DEFAULT_FIELDS):
+    # Returns the requested fields in ALLOWED_FIELDS order, or `default` when
+    # the parameter is absent, so ?fields=title,id and ?fields=id,title are
+    # the same request (and the same cached response). Raises ValueError for
+    # unknown or repeated names.
+    raw = req.params.get('fields')
+    if raw is None:
+        return default
+
+    fields = tuple(field.strip() for field in raw.split(",") if field.strip())
+    if not fields:
+        raise ValueError(f"fields must list at least one of: {', '.join(ALLOWED_FIELDS)}.")
+    unknown = [field for field in fields if field not in ALLOWED_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Allowed fields: {', '.join(ALLOWED_FIELDS)}.")
+    if len(set(fields)) != len(fields):
+        raise ValueError("fields must not repeat a name.")
+    return tuple(field for field in ALLOWED_FIELDS if field in fields)
+
+
+def select(fields, where=None):
+    # SELECT clause for the given fields; None selects whole documents
+    columns = "*" if fields is None else ", ".join(f"c.{field}" for field in fields)
+    query = f"SELECT {columns} FROM c"
+    if where:
+        query += f" WHERE {where}"
+    return query
+
+
+def project(items, fields):
+    # Like a Cosmos projection, properties a document lacks are left out
+    return [{field: item[field] for field in fields if field in item} for item in items]
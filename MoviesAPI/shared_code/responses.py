@@ -0,0 +1,146 @@
+import json
+import os
+from collections import OrderedDict
+
+import azure.functions as func
+
+from . import compression, http_cache
+
+# Shared response layer. Bodies are compact JSON unless the caller asks for
+# ?pretty=1, and clients that send `Accept: application/msgpack` get
+# MessagePack instead. orjson and msgpack are optional: without orjson the
+# stdlib encoder is used, and without msgpack every response is JSON.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+MSGPACK_TYPES = {"application/msgpack", "application/x-msgpack", "application/vnd.msgpack"}
+
+# Responses differ by Accept, so shared caches must key on it
+VARY = {"Vary": "Accept"}
+
+# Serialized bodies of hot responses, keyed by request variant. An entry is
+# only reused while the version of the data it was built from is unchanged,
+# e.g. the catalog cache generation. Entries hold the version, not the data,
+# so a cached body never keeps a replaced snapshot alive. The cache is bounded both by entry count and by
+# the total size of the bodies and their compressed forms, since a single
+# full-catalog variant can be megabytes.
+_serialized = OrderedDict()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _max_entries():
+    return int(os.getenv('RESPONSE_CACHE_ENTRIES', '256'))
+
+
+def _max_bytes():
+    return int(os.getenv('RESPONSE_CACHE_BYTES', str(64 * 1024 * 1024)))
+
+
+def _entry_bytes(entry):
+    _, body, _, compressed = entry
+    return len(body) + sum(len(value) for value in compressed.values())
+
+
+def _evict():
+    # Least recently used first, but never the entry just stored
+    max_entries, max_bytes = _max_entries(), _max_bytes()
+    total = sum(_entry_bytes(entry) for entry in _serialized.values())
+    while len(_serialized) > 1 and (len(_serialized) > max_entries or total > max_bytes):
+        _, entry = _serialized.popitem(last=False)
+        total -= _entry_bytes(entry)
+
+
+def wants_pretty(req):
+    return req.params.get('pretty', '').lower() in ('1', 'true', 'yes')
+
+
+def _accepted(req):
+    # Media types from the Accept header with their q-values, best first
+    accepted = []
+    for part in (req.headers.get("Accept") or "").split(","):
+        media_type, *params = [value.strip() for value in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if media_type and q > 0:
+            accepted.append((q, media_type.lower()))
+    return [media_type for _, media_type in sorted(accepted, key=lambda entry: -entry[0])]
+
+
+def negotiate(req):
+    # MessagePack only when it is installed and preferred over JSON
+    if msgpack is not None:
+        for media_type in _accepted(req):
+            if media_type in MSGPACK_TYPES:
+                return MSGPACK
+            if media_type in (JSON, "application/*", "*/*"):
+                break
+    return JSON
+
+
+def encode(data, mimetype=JSON, pretty=False):
+    if mimetype == MSGPACK:
+        return msgpack.packb(data, use_bin_type=True)
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(data, indent=4, ensure_ascii=False).encode("utf-8")
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def respond(req, data, endpoint=None, status_code=200):
+    # Encodes data for this request. With an endpoint name the response also
+    # carries an ETag and Cache-Control and may become a 304.
+    mimetype = negotiate(req)
+    body = encode(data, mimetype, wants_pretty(req))
+    if endpoint is not None and status_code == 200:
+        return http_cache.respond(req, body, mimetype, endpoint, headers=VARY)
+    coding, body = compression.negotiate(req, body)
+    headers = compression.vary(dict(VARY))
+    if coding is not None:
+        headers["Content-Encoding"] = coding
+    return func.HttpResponse(body=body, status_code=status_code, mimetype=mimetype, headers=headers)
+
+
+def respond_cached(req, key, version, source, build, endpoint):
+    # Like respond(), but the encoded body, its ETag and its compressed forms
+    # are kept for as long as `version` stays the same, so a hot endpoint
+    # neither rebuilds, re-encodes, re-hashes nor recompresses its response on
+    # every request. A version of None is never cached.
+    mimetype = negotiate(req)
+    pretty = wants_pretty(req)
+    if version is None:
+        return http_cache.respond(req, encode(build(source), mimetype, pretty), mimetype, endpoint, headers=VARY)
+    cache_key = (key, mimetype, pretty)
+
+    entry = _serialized.get(cache_key)
+    if entry is not None and entry[0] == version:
+        _serialized.move_to_end(cache_key)
+        _stats["hits"] += 1
+    else:
+        body = encode(build(source), mimetype, pretty)
+        entry = (version, body, http_cache.etag_for(body), {})
+        _serialized[cache_key] = entry
+        _stats["misses"] += 1
+        _evict()
+
+    _, body, etag, compressed = entry
+    return http_cache.respond(req, body, mimetype, endpoint, etag=etag, headers=VARY, compressed=compressed)
+
+
+def serialized_stats():
+    return dict(_stats, entries=len(_serialized),
+                bytes=sum(_entry_bytes(entry) for entry in _serialized.values()))
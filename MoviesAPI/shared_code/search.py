@@ -0,0 +1,169 @@
+import heapq
+import os
+from bisect import bisect_left
+import re
+from collections import Counter, defaultdict
+
+from . import catalog_cache, titles
+
+# Typo-tolerant title search over the cached catalog.
+#
+# Every title is broken into trigrams of its normalized words, padded the
+# way pg_trgm does it ("dark" -> "  d", " da", "dar", "ark", "rk "), and an
+# inverted index maps each trigram to the movies that contain it. A query
+# counts shared trigrams through the postings of its own rarest trigrams only,
+# a bounded share of the catalog however common its trigrams are.
+#
+# Each candidate gets a score between 0 and 1 that blends how much of the
+# query the title covers (partial words such as "shawshank") with the overall
+# trigram similarity (which ranks "inception" above "inception 2" for
+# "incepton").
+_WORDS = re.compile(r"[0-9a-z]+")
+
+# A trigram in more than this share of the catalog says little about a
+# match; it is skipped when the query has rarer ones to go on. A query made
+# only of common trigrams ("the") counts about this many postings in all.
+COMMON_TRIGRAM_SHARE = 0.05
+
+# Rare postings counted per query, as a multiple of the common threshold; the
+# rarest trigrams of a long query are enough to rank its candidates
+RARE_POSTINGS_BUDGET = 4
+
+# Candidates ranked by shared trigram count that are scored exactly, per
+# requested result
+CANDIDATES_PER_RESULT = 5
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+def trigrams(text):
+    # ASCII titles, by far the common case, need no accent folding
+    text = text.casefold() if text.isascii() else titles.normalize_title(text)
+    grams = set()
+    for word in _WORDS.findall(text):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    def __init__(self, movies, sizes, postings, positions):
+        self.movies = movies        # movie per position; None once superseded
+        self.sizes = sizes          # trigram count per position
+        self.postings = postings    # trigram -> positions
+        self.positions = positions  # movie id -> current position
+
+    def search(self, query, limit=DEFAULT_LIMIT, min_score=0.3):
+        # Returns [(score, movie)] best first
+        grams = trigrams(query)
+        if not grams:
+            return []
+
+        # Count shared trigrams through the rarer postings lists, then score
+        # only the most promising candidates exactly
+        lists = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+        common = max(100, int(len(self.positions) * COMMON_TRIGRAM_SHARE))
+        rare = [postings for postings in lists if len(postings) <= common]
+        counts = Counter()
+        scanned = 0
+        for postings in rare:
+            if scanned >= common * RARE_POSTINGS_BUDGET:
+                break
+            counts.update(postings)
+            scanned += len(postings)
+        if not rare:
+            # Every trigram is common, and counting them all would touch most
+            # of the catalog. Postings are in position order, so only those
+            # below a bound are counted, about `common` of them in all.
+            total = sum(map(len, lists))
+            bound = len(self.movies) * common // total if total > common else len(self.movies)
+            for postings in lists:
+                counts.update(postings[:bisect_left(postings, bound)])
+
+        scored = []
+        for position, _ in counts.most_common(limit * CANDIDATES_PER_RESULT):
+            movie = self.movies[position]
+            if movie is None:
+                continue
+            shared = len(grams & trigrams(movie.get("title") or ""))
+            coverage = shared / len(grams)
+            similarity = shared / (len(grams) + self.sizes[position] - shared)
+            score = 0.7 * coverage + 0.3 * similarity
+            if score >= min_score:
+                scored.append((score, -position, movie))
+        return [(score, movie) for score, _, movie in heapq.nlargest(limit, scored, key=lambda entry: entry[:2])]
+
+
+def build(movies):
+    postings = defaultdict(list)
+    index = TrigramIndex([], [], postings, {})
+    for position, movie in enumerate(movies):
+        grams = trigrams(movie.get("title") or "")
+        index.movies.append(movie)
+        index.sizes.append(len(grams))
+        index.positions[movie["id"]] = position
+        for gram in grams:
+            postings[gram].append(position)
+    index.postings = dict(postings)
+    return index
+
+
+def update(index, changes):
+    # Changed movies are appended at new positions and their old positions
+    # are blanked, so only the postings of their trigrams are copied. The
+    # blanked slots are reclaimed when the catalog is next fully reloaded.
+    movies = list(index.movies)
+    sizes = list(index.sizes)
+    postings = dict(index.postings)
+    positions = dict(index.positions)
+    copied = set()
+
+    def writable(gram):
+        if gram not in copied:
+            postings[gram] = list(postings.get(gram, ()))
+            copied.add(gram)
+        return postings[gram]
+
+    for movie in changes:
+        old = positions.get(movie["id"])
+        if old is not None:
+            movies[old] = None
+        grams = trigrams(movie.get("title") or "")
+        positions[movie["id"]] = len(movies)
+        for gram in grams:
+            writable(gram).append(len(movies))
+        movies.append(movie)
+        sizes.append(len(grams))
+    return TrigramIndex(movies, sizes, postings, positions)
+
+
+async def get_index(container=None):
+    return await catalog_cache.derived(build, container, update)
+
+
+async def search(query, limit=DEFAULT_LIMIT, container=None):
+    return (await get_index(container)).search(query, limit)
+
+
+def fallback_settings():
+    return {
+        "enabled": os.getenv('SUMMARY_FUZZY_FALLBACK', 'true').lower() in ('1', 'true', 'yes'),
+        "min_score": float(os.getenv('SEARCH_FALLBACK_MIN_SCORE', '0.7')),
+        "min_margin": float(os.getenv('SEARCH_FALLBACK_MIN_MARGIN', '0.1')),
+    }
+
+
+async def best_match(query, container=None):
+    # The movie `query` most likely refers to, or None unless the top result
+    # scores at least SEARCH_FALLBACK_MIN_SCORE and leads the runner-up by
+    # SEARCH_FALLBACK_MIN_MARGIN.
+    settings = fallback_settings()
+    if not settings["enabled"]:
+        return None
+    results = await search(query, limit=2, container=container)
+    if not results or results[0][0] < settings["min_score"]:
+        return None
+    if len(results) > 1 and results[0][0] - results[1][0] < settings["min_margin"]:
+        return None
+    return results[0][1]
@@ -0,0 +1,33 @@
+import asyncio
+
+# Request coalescing: while a call for a key is in flight, later callers with
+# the same key wait for that call instead of starting their own. Every waiter
+# gets the leader's result or its exception.
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight = {}
+        self._stats = {"leaders": 0, "coalesced": 0}
+
+    async def do(self, key, fn):
+        future = self._inflight.get(key)
+        if future is not None:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["leaders"] += 1
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        # shield: one waiter being cancelled must not cancel the shared call
+        return await asyncio.shield(future)
+
+    def _forget(self, key, future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            # Mark the exception as retrieved even if every waiter went away
+            future.exception()
+
+    def stats(self):
+        return dict(self._stats, inflight=len(self._inflight))
@@ -0,0 +1,85 @@
+import json
+
+# Incremental serialization of query results. Documents are encoded one at a
+# time as Cosmos pages arrive and handed out in chunks of roughly CHUNK_SIZE
+# bytes, so the full result set never has to sit in memory as a list or as a
+# single pretty-printed string.
+#
+# Only the serializer's memory is bounded. The v1 Python worker cannot send a
+# body in pieces, so handlers still join the chunks with read_all() and their
+# peak is about twice the compact body. Memory stays flat end to end only once
+# the app runs on a host that can stream HTTP responses.
+CHUNK_SIZE = 64 * 1024
+PAGE_SIZE = 500
+
+FORMATS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+async def iter_query(container, query, parameters=None, page_size=PAGE_SIZE):
+    # Yields documents page by page; only the current page is held in memory.
+    pages = container.query_items(
+        query=query,
+        parameters=parameters,
+        enable_cross_partition_query=True,
+        max_item_count=page_size
+    ).by_page()
+    async for page in pages:
+        async for item in page:
+            yield item
+
+
+async def _chunked(pieces):
+    buffer = []
+    size = 0
+    async for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer).encode("utf-8")
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+async def _json_array_pieces(items):
+    yield "["
+    first = True
+    async for item in items:
+        if not first:
+            yield ","
+        yield _encoder.encode(item)
+        first = False
+    yield "]"
+
+
+async def _ndjson_pieces(items):
+    async for item in items:
+        yield _encoder.encode(item)
+        yield "\n"
+
+
+def iter_json_array(items):
+    return _chunked(_json_array_pieces(items))
+
+
+def iter_ndjson(items):
+    return _chunked(_ndjson_pieces(items))
+
+
+def serialize(items, fmt):
+    # Returns (async chunk iterator, mimetype) for one of FORMATS.
+    if fmt == "ndjson":
+        return iter_ndjson(items), FORMATS[fmt]
+    if fmt == "json":
+        return iter_json_array(items), FORMATS[fmt]
+    raise ValueError(f"Unsupported stream format: {fmt}. Use one of: {', '.join(FORMATS)}.")
+
+
+async def read_all(chunks):
+    return b"".join([chunk async for chunk in chunks])
@@ -0,0 +1,134 @@
+import hashlib
+import logging
+import os
+import time
+
+from . import cosmos, llm, titles
+from .single_flight import SingleFlight
+
+# Generated movie summaries are kept in their own container so a title only
+# costs one Mistral completion until its summary expires. Entries are keyed by
+# title, model and a hash of the prompt template, so changing either the model
+# or the prompt naturally produces fresh summaries.
+MODEL = "mistral-small-latest"
+
+PROMPT_TEMPLATE = (
+    "Write a concise summary for the movie '{title}', "
+    "in no more than 3-4 sentences."
+)
+
+
+# Concurrent generations of the same summary share one Mistral call
+_generations = SingleFlight()
+
+
+def _container():
+    return cosmos.get_async_container(os.getenv('COSMOS_SUMMARIES_CONTAINER_ID', 'SummariesContainer'))
+
+
+def max_age():
+    # Seconds a stored summary stays valid; 0 keeps summaries forever
+    return int(os.getenv('SUMMARY_MAX_AGE_SECONDS', str(30 * 24 * 3600)))
+
+
+def build_prompt(movie):
+    return PROMPT_TEMPLATE.format(title=movie["title"])
+
+
+def prompt_hash():
+    return hashlib.sha256(PROMPT_TEMPLATE.encode("utf-8")).hexdigest()[:16]
+
+
+def summary_id(movie, model=MODEL):
+    return f"{titles.title_id(movie['title'])}.{model}.{prompt_hash()}"
+
+
+def format_summary(summary):
+    # Newlines become <br> tags for the front-end
+    return summary.replace('\n', '<br>')
+
+
+async def get_cached(movie, model=MODEL, container=None):
+    # Returns the stored summary text, or None if there is none or it expired.
+    container = container or _container()
+    doc_id = summary_id(movie, model)
+    try:
+        doc = await container.read_item(item=doc_id, partition_key=doc_id)
+    except cosmos.exceptions.CosmosResourceNotFoundError:
+        return None
+    except cosmos.exceptions.CosmosHttpResponseError as e:
+        logging.warning(f"Could not read stored summary for {movie['title']}: {str(e)}")
+        return None
+
+    return doc["summary"] if _is_fresh(doc) else None
+
+
+def _is_fresh(doc):
+    age = max_age()
+    return not age or time.time() - doc.get("createdAt", 0) <= age
+
+
+async def get_cached_many(movies, model=MODEL, container=None):
+    # Returns {summary id: summary text} for the movies that have a fresh
+    # stored summary, using one query instead of a read per movie.
+    container = container or _container()
+    ids = list(dict.fromkeys(summary_id(movie, model) for movie in movies))
+    if not ids:
+        return {}
+    names = [f"@id{i}" for i in range(len(ids))]
+    query = f"SELECT * FROM c WHERE c.id IN ({', '.join(names)})"
+    parameters = [{"name": name, "value": value} for name, value in zip(names, ids)]
+    try:
+        docs = [doc async for doc in container.query_items(
+            query=query, parameters=parameters, enable_cross_partition_query=True)]
+    except cosmos.exceptions.CosmosHttpResponseError as e:
+        logging.warning(f"Could not read stored summaries: {str(e)}")
+        return {}
+    return {doc["id"]: doc["summary"] for doc in docs if _is_fresh(doc)}
+
+
+async def store(movie, summary, model=MODEL, container=None):
+    container = container or _container()
+    doc_id = summary_id(movie, model)
+    doc = {
+        "id": doc_id,
+        "titleId": titles.title_id(movie["title"]),
+        "title": movie["title"],
+        "model": model,
+        "promptHash": prompt_hash(),
+        "summary": summary,
+        "createdAt": int(time.time()),
+    }
+    age = max_age()
+    if age:
+        # Lets Cosmos purge expired entries when TTL is enabled on the container
+        doc["ttl"] = age
+    try:
+        await container.upsert_item(doc)
+    except cosmos.exceptions.CosmosHttpResponseError as e:
+        # A failed write only costs a regeneration next time
+        logging.warning(f"Could not store summary for {movie['title']}: {str(e)}")
+
+
+async def generate(movie, model=MODEL):
+    # Asks Mistral for a new summary and stores it. Raises llm.LLMError.
+    async def run():
+        summary = await llm.complete(build_prompt(movie), model)
+        await store(movie, summary, model)
+        return summary
+
+    return await _generations.do(summary_id(movie, model), run)
+
+
+def generation_stats():
+    return _generations.stats()
+
+
+def summary_item(movie, summary):
+    return {
+        "title": movie["title"],
+        "releaseYear": movie["releaseYear"],
+        "genre": movie["genre"],
+        "coverUrl": movie["coverUrl"],
+        "generatedSummary": format_summary(summary)
+    }
@@ -0,0 +1,91 @@
+import re
+import unicodedata
+
+from . import catalog_cache, cosmos, partitioning
+
+# Movie documents use a slug of their title as the document id, so a title
+# lookup is a single point read instead of a cross-partition query.
+# "The Dark Knight", "the  dark knight" and "THE DARK KNIGHT " all map to
+# "the-dark-knight".
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_title(title):
+    # Case-, accent- and whitespace-insensitive form of a title
+    title = unicodedata.normalize("NFKD", title)
+    title = "".join(ch for ch in title if not unicodedata.combining(ch))
+    return " ".join(title.casefold().split())
+
+
+def title_id(title):
+    return _NON_ALNUM.sub("-", normalize_title(title)).strip("-")
+
+
+# Partition key path of each movies container, read once per worker
+_key_paths = {}
+
+# Partition key of a movie whose key property is not kept in the catalog cache
+_UNKNOWN = object()
+
+
+async def _key_path(container):
+    path = _key_paths.get(container.id)
+    if path is None:
+        path = _key_paths[container.id] = partitioning.key_path(await container.read())
+    return path
+
+
+async def _partition_key(movie_id, container):
+    # Returns the partition key value for point-reading `movie_id`, None when
+    # the movie is not in the catalog, or _UNKNOWN when the value cannot be
+    # known without reading the document.
+    key = partitioning.layout()
+    if key is None:
+        path = await _key_path(container)
+        if path == "/id":
+            return movie_id
+    # The key is not part of the request, so take the release year (or the
+    # legacy key property) from the cached catalog. A title that is not in the
+    # catalog needs no read at all.
+    movie = await catalog_cache.get_movie(movie_id, container)
+    if movie is None:
+        return None
+    if key is not None:
+        return partitioning.partition_key_for_year(movie["releaseYear"], key)
+    value = partitioning.key_value(movie, path)
+    return value if value is not None else _UNKNOWN
+
+
+async def read_movie(title, container=None):
+    # Returns the movie document for `title`, or None when there is no such movie.
+    movie_id = title_id(title)
+    if not movie_id:
+        return None
+
+    container = container or cosmos.get_async_container()
+    partition_key = await _partition_key(movie_id, container)
+    if partition_key is None:
+        return None
+    if partition_key is _UNKNOWN:
+        # Legacy container partitioned on a property the catalog does not
+        # keep: look the id up across partitions instead
+        return (await read_movies([title], container)).get(movie_id)
+    try:
+        return await container.read_item(item=movie_id, partition_key=partition_key)
+    except cosmos.exceptions.CosmosResourceNotFoundError:
+        return None
+
+
+async def read_movies(title_list, container=None):
+    # Returns {title id: movie document} for the titles that exist, fetched
+    # with a single query however many titles are asked for.
+    ids = list(dict.fromkeys(movie_id for movie_id in map(title_id, title_list) if movie_id))
+    if not ids:
+        return {}
+
+    container = container or cosmos.get_async_container()
+    names = [f"@id{i}" for i in range(len(ids))]
+    query = f"SELECT * FROM c WHERE c.id IN ({', '.join(names)})"
+    parameters = [{"name": name, "value": value} for name, value in zip(names, ids)]
+    docs = container.query_items(query=query, parameters=parameters, enable_cross_partition_query=True)
+    return {doc["id"]: doc async for doc in docs}
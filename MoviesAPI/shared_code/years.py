@@ -0,0 +1,84 @@
+from bisect import bisect_left, bisect_right
+
+from . import catalog_cache
+
+# Year and year-range lookups over the cached catalog. Movies are kept sorted
+# by (release year, id) next to a parallel list of the years, so a range is
+# two binary searches and a slice. The index is derived from the catalog
+# snapshot and updated for just the changed movies when the snapshot is
+# patched from the change feed. Movies whose releaseYear is not a number are
+# left out.
+#
+# Accepted forms: "2010", "2000-2010", "2000-" (2000 onwards) and "-1999"
+# (up to 1999).
+
+
+def parse_range(value):
+    # Returns (first, last) years, either of which may be None for an open end.
+    # Raises ValueError for anything else.
+    value = (value or "").strip()
+    first, separator, last = value.partition("-")
+    try:
+        first = int(first) if first.strip() else None
+        last = int(last) if last.strip() else None
+    except ValueError:
+        raise ValueError("Year must be a number or a range, e.g. 2010, 2000-2010, 2000- or -1999.")
+    if not separator:
+        if first is None:
+            raise ValueError("Year must be a number or a range, e.g. 2010, 2000-2010, 2000- or -1999.")
+        return first, first
+    if first is None and last is None:
+        raise ValueError("A year range needs at least one end, e.g. 2000- or -1999.")
+    if first is not None and last is not None and first > last:
+        raise ValueError("The start of a year range must not be after its end.")
+    return first, last
+
+
+def _year(movie):
+    try:
+        return int(movie.get("releaseYear"))
+    except (TypeError, ValueError):
+        return None
+
+
+class YearIndex:
+    def __init__(self, keys, movies):
+        self.keys = keys      # sorted (year, id) pairs
+        self.years = [year for year, _ in keys]
+        self.movies = movies  # movie for each key, same order
+
+    def between(self, first=None, last=None):
+        start = 0 if first is None else bisect_left(self.years, first)
+        end = len(self.years) if last is None else bisect_right(self.years, last)
+        return self.movies[start:end]
+
+
+def build(movies):
+    entries = sorted(((year, movie["id"]), movie) for movie in movies
+                     if (year := _year(movie)) is not None)
+    return YearIndex([key for key, _ in entries], [movie for _, movie in entries])
+
+
+def update(index, changes):
+    # New index without the changed movies' old entries and with their new
+    # ones inserted in order; the previous index is left untouched.
+    changed = {movie["id"] for movie in changes}
+    keys = []
+    movies = []
+    for key, movie in zip(index.keys, index.movies):
+        if key[1] not in changed:
+            keys.append(key)
+            movies.append(movie)
+
+    for movie in changes:
+        year = _year(movie)
+        if year is None:
+            continue
+        position = bisect_left(keys, (year, movie["id"]))
+        keys.insert(position, (year, movie["id"]))
+        movies.insert(position, movie)
+    return YearIndex(keys, movies)
+
+
+async def get_index(container=None):
+    return await catalog_cache.derived(build, container, update)
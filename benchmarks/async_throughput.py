@@ -0,0 +1,91 @@
+"""Throughput of the async functions at 1, 10 and 100 concurrent clients.
+
+Runs GetMovies, GetMoviesByYear and GetMovieSummary in one event loop against
+the local Cosmos stand-in (with simulated per-request latency) and
+tools/mock_mistral.py, so the numbers show how many in-flight requests a single
+worker overlaps while it waits on I/O.
+
+    python benchmarks/async_throughput.py [--requests 300]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "MoviesAPI"))
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+
+import azure.functions as func  # noqa: E402
+from shared_code import cosmos, llm, local_cosmos  # noqa: E402
+from mock_mistral import MockMistral, start  # noqa: E402
+
+import GetMovies  # noqa: E402
+import GetMoviesByYear  # noqa: E402
+import GetMovieSummary  # noqa: E402
+
+CONCURRENCY = [1, 10, 100]
+
+
+def scenarios():
+    return {
+        "GetMovies": lambda: GetMovies.main(func.HttpRequest("GET", "/api/GetMovies", body=b"", params={"pageSize": "50"})),
+        "GetMoviesByYear": lambda: GetMoviesByYear.main(func.HttpRequest(
+            "GET", "/api/getmoviesbyyear/2010", body=b"", route_params={"year": "2010"}, params={"pageSize": "50"})),
+        "GetMovieSummary": lambda: GetMovieSummary.main(func.HttpRequest(
+            "GET", "/api/getmoviesummary/Inception", body=b"", route_params={"title": "Inception"},
+            params={"refresh": "1"})),
+    }
+
+
+async def drive(call, total, concurrency):
+    remaining = iter(range(total))
+    failures = 0
+
+    async def client():
+        nonlocal failures
+        for _ in remaining:
+            response = await call()
+            if response.status_code != 200:
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return total / (time.perf_counter() - started), failures
+
+
+async def run(args):
+    with open(os.path.join(ROOT, "movies.json")) as f:
+        movies = local_cosmos.AsyncLocalContainer(local_cosmos.LocalContainer(
+            json.load(f), partition_latency=args.cosmos_ms / 1000))
+    summaries = local_cosmos.AsyncLocalContainer(partition_latency=args.cosmos_ms / 1000)
+    cosmos.get_async_container = lambda container_id=None: summaries if container_id == "SummariesContainer" else movies
+
+    runner, os.environ["MISTRAL_BASE_URL"] = await start(MockMistral(latency=f"fixed:{args.llm_ms}"))
+    try:
+        print(f"{'endpoint':<18}" + "".join(f"{f'{c} clients':>14}" for c in CONCURRENCY) + "   (requests/s)")
+        for name, call in scenarios().items():
+            row = []
+            for concurrency in CONCURRENCY:
+                rps, failures = await drive(call, args.requests, concurrency)
+                row.append(f"{rps:>14.1f}" + ("!" if failures else ""))
+            print(f"{name:<18}" + "".join(row))
+    finally:
+        await llm.get_session().close()
+        await runner.cleanup()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300, help="requests per endpoint and concurrency level")
+    parser.add_argument("--cosmos-ms", type=float, default=5.0, help="simulated Cosmos latency per request")
+    parser.add_argument("--llm-ms", type=float, default=100.0, help="simulated completion latency")
+    args = parser.parse_args(argv)
+    asyncio.run(run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""Import-time budget and cold-start breakdown for every function.
+
+Each function is loaded in a fresh interpreter running `python -X importtime`,
+with azure.functions already imported as it is in the worker, and then
+invoked twice against the local Cosmos stand-in (COSMOS_BACKEND=local) and
+tools/mock_mistral.py. For each function it reports:
+
+    import     time to import the function module, and its largest imports
+    lazy       imports that happened during the first invocation
+    first      the whole first invocation, lazy imports included
+    warm       the second invocation
+
+The run fails (exit status 1) when a function takes longer than
+--budget-ms to import, or loads one of HEAVY_MODULES at import time; those
+belong on first use. Against a real account the first invocation would also
+import the aiohttp Cosmos transport and open connections, which the local
+stand-in does not.
+
+    python benchmarks/cold_start.py [--budget-ms 50] [--output cold_start.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+MOVIES_API = os.path.join(ROOT, "MoviesAPI")
+
+# SDKs that must not be imported while a function module loads
+HEAVY_MODULES = ("aiohttp", "azure.cosmos", "azure.core", "requests")
+
+# (function, method, url, route params, params, body); None marks a function
+# that is only imported (timer triggers)
+REQUESTS = {
+    "GetMovies": ("GET", "/api/GetMovies", {}, {}, None),
+    "GetMoviesByYear": ("GET", "/api/getmoviesbyyear/2010", {"year": "2010"}, {}, None),
+    "GetMoviesByGenre": ("GET", "/api/getmoviesbygenre/Action", {"genre": "Action"}, {}, None),
+    "SearchMovies": ("GET", "/api/searchmovies", {}, {"q": "dark knight"}, None),
+    "GetMovieSummary": ("GET", "/api/getmoviesummary/Inception", {"title": "Inception"}, {}, None),
+    "GetMovieSummaries": ("POST", "/api/getmoviesummaries", {}, {}, {"titles": ["Inception", "The Dark Knight"]}),
+    "PresummarizeMovies": None,
+}
+
+MARKER = "--- cold start phase ---"
+
+
+def child(name):
+    # Runs inside the measured interpreter; timings go to stdout as JSON and
+    # -X importtime writes its lines to stderr between the phase markers
+    import azure.functions as func
+
+    sys.path.insert(0, MOVIES_API)
+
+    def phase():
+        sys.stderr.write(MARKER + "\n")
+        sys.stderr.flush()
+
+    phase()
+    started = time.perf_counter()
+    module = __import__(name)
+    timings = {"import_wall_ms": (time.perf_counter() - started) * 1000,
+               "heavy_at_import": [heavy for heavy in HEAVY_MODULES if heavy in sys.modules]}
+    phase()
+
+    spec = REQUESTS[name]
+    if spec is not None:
+        method, url, route_params, params, body = spec
+        body = json.dumps(body).encode("utf-8") if body is not None else b""
+
+        async def invoke():
+            response = await module.main(func.HttpRequest(method, url, body=body, route_params=route_params,
+                                                          params=params))
+            return response.status_code
+
+        async def twice():
+            started = time.perf_counter()
+            first = await invoke()
+            timings["first_ms"] = (time.perf_counter() - started) * 1000
+            phase()
+            started = time.perf_counter()
+            await invoke()
+            timings["warm_ms"] = (time.perf_counter() - started) * 1000
+            timings["status"] = first
+
+        asyncio.run(twice())
+    print(json.dumps(timings))
+
+
+def parse_importtime(lines):
+    # [(level, name, self_us, cumulative_us)] for the -X importtime lines
+    entries = []
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_part, cumulative_us, name = line.split("|", 2)
+        self_us = self_part.split(":", 1)[1]
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((level, name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+def measure(name, base_url):
+    env = dict(os.environ, COSMOS_BACKEND="local", MISTRAL_BASE_URL=base_url, mistral_api_key="mock",
+               PYTHONDONTWRITEBYTECODE="1")
+    process = subprocess.run([sys.executable, "-X", "importtime", os.path.abspath(__file__), "--child", name],
+                             capture_output=True, text=True, env=env, cwd=MOVIES_API)
+    if process.returncode != 0:
+        raise RuntimeError(f"{name} failed:\n{process.stderr[-2000:]}")
+    timings = json.loads(process.stdout.strip().splitlines()[-1])
+
+    sections = process.stderr.split(MARKER + "\n")
+    imported = parse_importtime(sections[1].splitlines())
+    top = [entry for entry in imported if entry[0] == 0]
+    timings["import_ms"] = sum(cumulative for _, _, _, cumulative in top) / 1000
+    children = [entry for entry in imported if entry[0] == 1] + [entry for entry in top if entry[1] != name]
+    timings["largest_imports"] = [(entry[1], round(entry[3] / 1000, 2))
+                                  for entry in sorted(children, key=lambda entry: -entry[3])[:5]]
+    if len(sections) > 2:
+        lazy = [entry for entry in parse_importtime(sections[2].splitlines()) if entry[0] == 0]
+        timings["lazy_import_ms"] = sum(cumulative for _, _, _, cumulative in lazy) / 1000
+        timings["lazy_imports"] = [(entry[1], round(entry[3] / 1000, 2))
+                                   for entry in sorted(lazy, key=lambda entry: -entry[3])[:5]]
+    return timings
+
+
+def start_mock():
+    # The mock runs in this process, on its own loop, so the measured
+    # interpreters never import aiohttp on its behalf
+    sys.path.insert(0, os.path.join(ROOT, "tools"))
+    from mock_mistral import MockMistral, start
+
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    result = {}
+
+    def serve():
+        asyncio.set_event_loop(loop)
+        result["runner"], result["url"] = loop.run_until_complete(start(MockMistral(latency="fixed:50")))
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    ready.wait()
+    return result["url"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv('IMPORT_BUDGET_MS', '50')),
+                        help="maximum import time per function module")
+    parser.add_argument("--output", help="write the breakdown to this JSON file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        child(args.child)
+        return 0
+
+    base_url = start_mock()
+    results = {}
+    failures = []
+    print(f"{'function':<22}{'import ms':>10}{'lazy ms':>9}{'first ms':>10}{'warm ms':>9}   largest imports")
+    for name in REQUESTS:
+        timings = results[name] = measure(name, base_url)
+        print(f"{name:<22}{timings['import_ms']:>10.1f}{timings.get('lazy_import_ms', 0):>9.1f}"
+              f"{timings.get('first_ms', 0):>10.1f}{timings.get('warm_ms', 0):>9.2f}   "
+              + ", ".join(f"{module} {ms}" for module, ms in timings["largest_imports"][:3]))
+        if timings["import_ms"] > args.budget_ms:
+            failures.append(f"{name} imports in {timings['import_ms']:.1f} ms (budget {args.budget_ms} ms)")
+        if timings["heavy_at_import"]:
+            failures.append(f"{name} imports {', '.join(timings['heavy_at_import'])} at load time")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"budget_ms": args.budget_ms, "functions": results}, f, indent=2)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Bytes on the wire versus CPU for compressed GetMovies responses.
+
+Encodes synthetic catalogs the way GetMovies does (compact JSON through
+shared_code.responses) and compresses them with every coding the functions
+can negotiate. For each one it reports the compressed size, the ratio to the
+identity body and the compression time, plus the cost of serving the same
+body again from the compressed forms kept by a cached response.
+
+    python benchmarks/compression.py [--movies 1000 10000 100000] [--runs 5]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "MoviesAPI"))
+
+import azure.functions as func  # noqa: E402
+
+from shared_code import compression, responses  # noqa: E402
+
+GENRES = ["Action", "Drama", "Comedy", "Crime", "Science Fiction", "Horror", "Romance", "Thriller"]
+
+
+def synthetic_movies(count, seed=7):
+    rng = random.Random(seed)
+    return [
+        {"title": f"Movie {i}", "releaseYear": str(rng.randint(1950, 2024)),
+         "genre": ", ".join(rng.sample(GENRES, 2)), "coverUrl": f"https://example.invalid/covers/{i}.jpg"}
+        for i in range(count)
+    ]
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return result, statistics.median(samples)
+
+
+def codings():
+    settings = compression._settings()
+    options = [("gzip-1", "gzip", dict(settings, gzip_level=1)),
+               ("gzip-6", "gzip", dict(settings, gzip_level=6)),
+               ("gzip-9", "gzip", dict(settings, gzip_level=9))]
+    if compression.brotli is not None:
+        options += [("br-5", "br", dict(settings, brotli_quality=5)),
+                    ("br-11", "br", dict(settings, brotli_quality=11))]
+    return options
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--movies", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if compression.brotli is None:
+        print("brotli is not installed; only gzip is measured.")
+    print(f"{'movies':>8} {'coding':<8}{'bytes':>12}{'ratio':>8}{'ms':>10}{'MB/s':>9}")
+    for count in args.movies:
+        body = responses.encode(synthetic_movies(count))
+        print(f"{count:>8} {'identity':<8}{len(body):>12}{1.0:>8.3f}{0.0:>10.2f}{'-':>9}")
+        for label, coding, settings in codings():
+            compressed, ms = timed(lambda: compression.compress(body, coding, settings), args.runs)
+            throughput = len(body) / 1e6 / (ms / 1000) if ms else float("inf")
+            print(f"{count:>8} {label:<8}{len(compressed):>12}{len(compressed) / len(body):>8.3f}{ms:>10.2f}{throughput:>9.1f}")
+
+        # A cached response compresses once; later requests reuse the bytes
+        req = func.HttpRequest("GET", "/api/getmovies", body=b"", headers={"Accept-Encoding": "br, gzip"})
+        cache = {}
+        compression.negotiate(req, body, cache)
+        _, ms = timed(lambda: compression.negotiate(req, body, cache), args.runs)
+        print(f"{count:>8} {'reused':<8}{len(next(iter(cache.values()))):>12}{'':>8}{ms:>10.4f}{'':>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""End-to-end latency and throughput of the catalog and summary endpoints.
+
+Drives GetMovies, GetMoviesByYear and GetMovieSummary in-process against the
+local Cosmos stand-in (COSMOS_BACKEND=local) and tools/mock_mistral.py, for
+every combination of catalog size, concurrency level and cache state:
+
+    cold   every batch of concurrent requests starts with empty caches: a new
+           Cosmos client, no catalog snapshot, no encoded responses and no
+           stored summaries, so summaries are generated by the mock LLM
+    warm   caches are primed first; summaries of the --hot-titles titles that
+           GetMovieSummary asks for come from the store
+
+Each scenario reports p50/p95/p99 latency, requests per second, the process
+peak RSS so far and simulated RU per request. Results are written as JSON;
+pass an earlier file to --compare to see the change per scenario.
+
+    python benchmarks/endpoints.py [--movies 1000 10000] [--concurrency 1 10 50]
+        [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "MoviesAPI"))
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+
+import azure.functions as func  # noqa: E402
+
+from shared_code import catalog_cache, cosmos, llm, responses  # noqa: E402
+from generate_catalog import generate  # noqa: E402
+from mock_mistral import MockMistral, start  # noqa: E402
+
+import GetMovies  # noqa: E402
+import GetMoviesByYear  # noqa: E402
+import GetMovieSummary  # noqa: E402
+
+
+def percentile(samples, share):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))] if ordered else 0.0
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def request_charge():
+    return sum(container.request_charge for container in cosmos._local_containers.values())
+
+
+def reset_caches():
+    cosmos.reset_client()
+    catalog_cache.invalidate()
+    responses._serialized.clear()
+
+
+def endpoints(movies, rng, hot_titles):
+    # name -> (keys, call(key)); each request uses a random key, and warm
+    # scenarios prime every key first
+    years = sorted({movie["releaseYear"] for movie in movies})
+    hot = [movie["title"] for movie in rng.sample(movies, min(hot_titles, len(movies)))]
+
+    def request(url, **kwargs):
+        return func.HttpRequest("GET", url, body=b"", **kwargs)
+
+    return {
+        "GetMovies": ([None], lambda _: GetMovies.main(request("/api/GetMovies"))),
+        "GetMoviesByYear": (years, lambda year: GetMoviesByYear.main(
+            request(f"/api/getmoviesbyyear/{year}", route_params={"year": year}))),
+        "GetMovieSummary": (hot, lambda title: GetMovieSummary.main(
+            request(f"/api/getmoviesummary/{title}", route_params={"title": title}))),
+    }
+
+
+async def timed(call, latencies, failures):
+    started = time.perf_counter()
+    response = await call()
+    latencies.append((time.perf_counter() - started) * 1000)
+    if response.status_code != 200:
+        failures.append(response.status_code)
+
+
+async def run_warm(call, keys, total, concurrency):
+    latencies, failures = [], []
+    # Prime the caches for every key this endpoint will be asked for
+    await asyncio.gather(*(call(key) for key in keys))
+    charge = request_charge()
+    remaining = iter(range(total))
+
+    async def client():
+        for _ in remaining:
+            await timed(lambda: call(random.choice(keys)), latencies, failures)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, failures, time.perf_counter() - started, request_charge() - charge
+
+
+async def run_cold(call, keys, rounds, concurrency):
+    # Caches are cleared before each burst, so every burst pays the cold path
+    latencies, failures = [], []
+    elapsed = charge = 0.0
+    for _ in range(rounds):
+        reset_caches()
+        before = request_charge()
+        started = time.perf_counter()
+        await asyncio.gather(*(timed(lambda: call(random.choice(keys)), latencies, failures)
+                               for _ in range(concurrency)))
+        elapsed += time.perf_counter() - started
+        charge += request_charge() - before
+    return latencies, failures, elapsed, charge
+
+
+async def run(args):
+    results = []
+    mock = MockMistral(latency=args.llm_latency, seed=args.seed)
+    runner, os.environ["MISTRAL_BASE_URL"] = await start(mock)
+    os.environ["COSMOS_BACKEND"] = "local"
+    os.environ["LOCAL_COSMOS_LATENCY_MS"] = str(args.cosmos_ms)
+    try:
+        for count in args.movies:
+            movies = list(generate(count, args.seed))
+            with tempfile.NamedTemporaryFile("w", suffix=".ndjson", delete=False) as f:
+                f.writelines(json.dumps(movie) + "\n" for movie in movies)
+            os.environ["LOCAL_COSMOS_DATA"] = f.name
+            try:
+                random.seed(args.seed)
+                for name, (keys, call) in endpoints(movies, random.Random(args.seed), args.hot_titles).items():
+                    for state in ("cold", "warm"):
+                        for concurrency in args.concurrency:
+                            reset_caches()
+                            if state == "cold":
+                                latencies, failures, elapsed, charge = await run_cold(call, keys, args.cold_rounds, concurrency)
+                            else:
+                                latencies, failures, elapsed, charge = await run_warm(call, keys, args.requests, concurrency)
+                            result = {
+                                "endpoint": name, "movies": count, "state": state, "concurrency": concurrency,
+                                "requests": len(latencies), "failures": len(failures),
+                                "p50_ms": percentile(latencies, 0.50), "p95_ms": percentile(latencies, 0.95),
+                                "p99_ms": percentile(latencies, 0.99),
+                                "rps": len(latencies) / elapsed if elapsed else 0.0,
+                                "peak_rss_mb": peak_rss_mb(),
+                                "ru_per_request": charge / len(latencies) if latencies else 0.0,
+                            }
+                            results.append(result)
+                            print_row(result)
+            finally:
+                os.unlink(f.name)
+    finally:
+        await llm.get_session().close()
+        await runner.cleanup()
+    return results
+
+
+def print_header():
+    print(f"{'endpoint':<16}{'movies':>8}{'state':>6}{'conc':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'req/s':>10}{'RSS MB':>8}{'RU/req':>8}{'fail':>6}")
+
+
+def print_row(result):
+    print(f"{result['endpoint']:<16}{result['movies']:>8}{result['state']:>6}{result['concurrency']:>6}"
+          f"{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}{result['rps']:>10.1f}"
+          f"{result['peak_rss_mb']:>8.1f}{result['ru_per_request']:>8.2f}{result['failures']:>6}")
+
+
+def scenario_key(result):
+    return (result["endpoint"], result["movies"], result["state"], result["concurrency"])
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {scenario_key(result): result for result in json.load(f)["results"]}
+    print(f"\nChange against {baseline_path} (negative latency / positive req/s is better)")
+    print(f"{'endpoint':<16}{'movies':>8}{'state':>6}{'conc':>6}{'p95':>10}{'req/s':>10}{'RU/req':>10}")
+    for result in results:
+        before = baseline.get(scenario_key(result))
+        if before is None:
+            continue
+
+        def change(field):
+            return f"{(result[field] - before[field]) / before[field] * 100:+.1f}%" if before[field] else "n/a"
+        print(f"{result['endpoint']:<16}{result['movies']:>8}{result['state']:>6}{result['concurrency']:>6}"
+              f"{change('p95_ms'):>10}{change('rps'):>10}{change('ru_per_request'):>10}")
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--movies", type=int, nargs="+", default=[1000, 10000], help="catalog sizes")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--requests", type=int, default=200, help="requests per warm scenario")
+    parser.add_argument("--cold-rounds", type=int, default=3, help="cache-cleared bursts per cold scenario")
+    parser.add_argument("--cosmos-ms", type=float, default=5.0, help="simulated Cosmos latency per partition")
+    parser.add_argument("--llm-latency", default="lognormal:300:0.4", help="mock completion latency (ms)")
+    parser.add_argument("--hot-titles", type=int, default=20, help="distinct titles asked for in GetMovieSummary")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    print_header()
+    results = asyncio.run(run(args))
+    report = {
+        "commit": git_commit(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "settings": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {len(results)} results to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+    return 0 if all(result["failures"] == 0 for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
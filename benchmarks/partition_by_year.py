@@ -0,0 +1,75 @@
+"""Compare by-year lookups before and after partitioning on release year.
+
+Loads the same synthetic catalog into two local Cosmos stand-ins: the legacy
+layout (partitioned on /id, so by-year queries fan out to every physical
+partition) and the releaseYear layout produced by tools/migrate_partition_key.py.
+It then runs the same by-year queries against both and reports simulated RU
+and latency per query.
+
+    python benchmarks/partition_by_year.py [--movies 20000] [--partitions 10]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "MoviesAPI"))
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+
+from shared_code import local_cosmos, partitioning  # noqa: E402
+from migrate_partition_key import copy_documents  # noqa: E402
+
+QUERY = "SELECT c.title, c.releaseYear, c.genre, c.coverUrl FROM c WHERE c.releaseYear = @year"
+
+
+def synthetic_movies(count, seed=7):
+    rng = random.Random(seed)
+    return [
+        {"id": str(i), "title": f"Movie {i}", "releaseYear": str(rng.randint(1950, 2024)),
+         "genre": "Drama", "coverUrl": ""}
+        for i in range(count)
+    ]
+
+
+def run(container, years, options_for):
+    latencies = []
+    container.request_charge = 0.0
+    for year in years:
+        started = time.perf_counter()
+        list(container.query_items(query=QUERY, parameters=[{"name": "@year", "value": year}], **options_for(year)))
+        latencies.append((time.perf_counter() - started) * 1000)
+    return container.request_charge / len(years), statistics.median(latencies), max(latencies)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--movies", type=int, default=20000)
+    parser.add_argument("--partitions", type=int, default=10, help="physical partitions in each container")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="simulated round trip per partition")
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    latency = args.latency_ms / 1000
+    legacy = local_cosmos.LocalContainer(synthetic_movies(args.movies), partition_key_path="/id",
+                                         physical_partitions=args.partitions, partition_latency=latency)
+    by_year = local_cosmos.LocalContainer(partition_key_path="/releaseYear",
+                                          physical_partitions=args.partitions, partition_latency=latency)
+    copy_documents(legacy, by_year, partitioning.RELEASE_YEAR, log=lambda message: None)
+
+    years = [str(random.Random(i).randint(1950, 2024)) for i in range(args.queries)]
+    before = run(legacy, years, lambda year: {"enable_cross_partition_query": True})
+    after = run(by_year, years, lambda year: {
+        "partition_key": partitioning.partition_key_for_year(year, partitioning.RELEASE_YEAR)})
+
+    print(f"{args.movies} movies, {args.partitions} physical partitions, {args.latency_ms} ms per partition")
+    print(f"{'layout':<14}{'RU/query':>10}{'p50 ms':>10}{'max ms':>10}")
+    print(f"{'cross-part.':<14}{before[0]:>10.2f}{before[1]:>10.2f}{before[2]:>10.2f}")
+    print(f"{'releaseYear':<14}{after[0]:>10.2f}{after[1]:>10.2f}{after[2]:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""How endpoint latency and memory grow with catalog size.
+
+Runs benchmarks/endpoints.py once per catalog size, each in its own process
+so peak RSS reflects that size alone, on catalogs from
+tools/generate_catalog.py. It then prints p50/p95 latency, RU per request and
+peak RSS per endpoint and cache state side by side, with the growth factor
+from the smallest to the largest catalog.
+
+    python benchmarks/scaling.py [--movies 10000 100000 1000000] [--output scaling.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_size(count, args):
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        path = f.name
+    try:
+        command = [sys.executable, os.path.join(HERE, "endpoints.py"), "--movies", str(count),
+                   "--concurrency", str(args.concurrency), "--requests", str(args.requests),
+                   "--cold-rounds", str(args.cold_rounds), "--cosmos-ms", str(args.cosmos_ms),
+                   "--output", path]
+        subprocess.run(command, check=False, stdout=subprocess.DEVNULL)
+        with open(path) as f:
+            return json.load(f)["results"]
+    finally:
+        os.unlink(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--movies", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--cold-rounds", type=int, default=2)
+    parser.add_argument("--cosmos-ms", type=float, default=5.0)
+    parser.add_argument("--output", help="write all results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for count in args.movies:
+        print(f"Running {count} movies...", file=sys.stderr)
+        results.extend(run_size(count, args))
+
+    by_scenario = {}
+    for result in results:
+        by_scenario.setdefault((result["endpoint"], result["state"]), {})[result["movies"]] = result
+
+    sizes = args.movies
+    for metric, label in (("p50_ms", "p50 ms"), ("p95_ms", "p95 ms"), ("ru_per_request", "RU/request"),
+                          ("peak_rss_mb", "peak RSS MB")):
+        print(f"\n{label}")
+        print(f"{'endpoint':<16}{'state':>6}" + "".join(f"{size:>12}" for size in sizes) + f"{'growth':>9}")
+        for (endpoint, state), per_size in by_scenario.items():
+            values = [per_size[size][metric] if size in per_size else None for size in sizes]
+            cells = "".join(f"{value:>12.2f}" if value is not None else f"{'-':>12}" for value in values)
+            growth = f"{values[-1] / values[0]:>8.1f}x" if values[0] and values[-1] is not None else f"{'-':>9}"
+            print(f"{endpoint:<16}{state:>6}{cells}{growth}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,18 @@
 import azure.functions as func
-import os
-from azure.cosmos import CosmosClient, exceptions
 
-endpoint = os.environ['COSMOS_ENDPOINT']
-key = os.environ['COSMOS_KEY']
-client = CosmosClient(endpoint, key)
-database_name = 'MoviesDatabase'
-container_name = 'MoviesContainer'
-database = client.get_database_client(database_name)
-container = database.get_container_client(container_name)
+from MoviesAPI.shared_code import cosmos, projection, streaming
 
-def main(req: func.HttpRequest) -> func.HttpResponse:
+async def main(req: func.HttpRequest) -> func.HttpResponse:
     try:
-        query = "SELECT * FROM c"
-        items = list(container.query_items(query=query, enable_cross_partition_query=True))
-        return func.HttpResponse(body=str(items), status_code=200)
-    except exceptions.CosmosHttpResponseError as e:
+        # Whole documents unless ?fields= asks for a projection
+        fields = projection.fields_param(req, default=None)
+    except ValueError as e:
+        return func.HttpResponse(str(e), status_code=400)
+
+    try:
+        query = projection.select(fields)
+        items = streaming.iter_query(cosmos.get_async_container(), query)
+        chunks, mimetype = streaming.serialize(items, "json")
+        return func.HttpResponse(body=await streaming.read_all(chunks), status_code=200, mimetype=mimetype)
+    except cosmos.exceptions.CosmosHttpResponseError as e:
         return func.HttpResponse("Error connecting to Cosmos DB: " + str(e), status_code=500)
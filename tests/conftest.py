@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The function folders and shared_code are imported the way the Functions
+# host does it, with MoviesAPI on sys.path.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "MoviesAPI"))
+sys.path.insert(0, os.path.join(ROOT, "tools"))
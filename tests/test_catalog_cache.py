@@ -0,0 +1,127 @@
+import asyncio
+import threading
+
+import pytest
+
+from shared_code import catalog_cache, genres, search, years
+from shared_code.local_cosmos import AsyncLocalContainer
+
+MOVIES = [
+    {"id": "inception", "title": "Inception", "releaseYear": "2010", "genre": "Action, Sci-Fi"},
+    {"id": "the-dark-knight", "title": "The Dark Knight", "releaseYear": "2008", "genre": "Action, Crime, Drama"},
+    {"id": "amelie", "title": "Amélie", "releaseYear": "2001", "genre": "Comedy, Romance"},
+]
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setenv("CATALOG_FEED_POLL_SECONDS", "0")
+    monkeypatch.setattr(catalog_cache, "_derived", {})
+    monkeypatch.setattr(catalog_cache, "_building", {})
+    monkeypatch.setattr(catalog_cache, "_versions", {})
+    catalog_cache.invalidate()
+    yield
+    catalog_cache.invalidate()
+
+
+def container():
+    return AsyncLocalContainer(items=[dict(movie) for movie in MOVIES])
+
+
+def test_changes_are_patched_into_a_new_snapshot():
+    movies = container()
+
+    async def main():
+        before = await catalog_cache.get_movies(movies)
+        await movies.upsert_item(dict(MOVIES[0], title="Inception (2010)"))
+        await movies.upsert_item({"id": "heat", "title": "Heat", "releaseYear": "1995", "genre": "Crime"})
+        after = await catalog_cache.get_movies(movies)
+        return before, after
+
+    before, after = asyncio.run(main())
+    assert before is not after
+    assert before[0]["title"] == "Inception"
+    assert {movie["id"]: movie["title"] for movie in after}["inception"] == "Inception (2010)"
+    assert len(after) == len(MOVIES) + 1
+
+
+def test_index_updates_match_a_full_build():
+    movies = container()
+    changed = [dict(MOVIES[0], genre="Sci-Fi, Thriller", releaseYear="2011"),
+               {"id": "heat", "title": "Heat", "releaseYear": "1995", "genre": "Crime"}]
+
+    async def main():
+        indexes = [await genres.get_index(movies), await years.get_index(movies), await search.get_index(movies)]
+        for doc in changed:
+            await movies.upsert_item(doc)
+        return indexes, [await genres.get_index(movies), await years.get_index(movies), await search.get_index(movies)]
+
+    (genre_before, year_before, search_before), (genre_after, year_after, search_after) = asyncio.run(main())
+
+    # The previous indexes are left as they were
+    assert genre_before.ids(["action"]) == ["inception", "the-dark-knight"]
+    assert [movie["id"] for movie in year_before.between(2010, 2010)] == ["inception"]
+
+    assert genre_after.ids(["action"]) == ["the-dark-knight"]
+    assert genre_after.ids(["crime"]) == ["heat", "the-dark-knight"]
+    assert genre_after.ids(["thriller", "sci-fi"]) == ["inception"]
+    assert [movie["id"] for movie in year_after.between(2010, 2011)] == ["inception"]
+    assert [movie["id"] for movie in year_after.between(None, 2000)] == ["heat"]
+    assert search_after.search("heat")[0][1]["id"] == "heat"
+    assert [movie["id"] for _, movie in search_after.search("inception")] == ["inception"]
+
+
+def test_full_rebuild_runs_off_the_loop_and_serves_the_previous_value(monkeypatch):
+    movies = container()
+    release = threading.Event()
+    builds = []
+
+    def build(snapshot):
+        builds.append(snapshot)
+        if len(builds) > 1:
+            # The second build waits until the test lets it finish
+            assert release.wait(5)
+        return len(snapshot)
+
+    async def main():
+        assert await catalog_cache.derived(build, movies) == len(MOVIES)
+        await movies.upsert_item({"id": "heat", "title": "Heat", "releaseYear": "1995", "genre": "Crime"})
+        # A TTL reload needs a full build; the old value is served meanwhile
+        monkeypatch.setenv("CATALOG_CACHE_TTL", "0")
+        assert await catalog_cache.derived(build, movies) == len(MOVIES)
+        assert await catalog_cache.derived(build, movies) == len(MOVIES)
+        release.set()
+        await catalog_cache._building[build]
+        monkeypatch.setenv("CATALOG_CACHE_TTL", "300")
+        return await catalog_cache.derived(build, movies)
+
+    assert asyncio.run(main()) == len(MOVIES) + 1
+
+
+def test_cached_responses_do_not_hold_snapshots(monkeypatch):
+    import gc
+
+    import azure.functions as func
+    from shared_code import responses
+
+    monkeypatch.setattr(responses, "_serialized", type(responses._serialized)())
+    movies = container()
+    request = func.HttpRequest(method="GET", url="/api/getmovies", headers={}, params={}, body=b"")
+
+    async def serve():
+        items = await catalog_cache.get_movies(movies)
+        responses.respond_cached(request, ("test",), catalog_cache.version(items), items, list, "GetMovies")
+        return items
+
+    async def main():
+        old = await serve()
+        await movies.upsert_item(dict(MOVIES[0], title="Inception (2010)"))
+        return old, await serve()
+
+    old, new = asyncio.run(main())
+    assert catalog_cache.version(new) is not None
+    # A replaced snapshot has no version, and no cached body refers to it
+    assert catalog_cache.version(old) is None
+    entries = list(responses._serialized.values())
+    assert not any(referrer is entry for referrer in gc.get_referrers(old) for entry in entries)
+    assert not any(referrer is entry for referrer in gc.get_referrers(new) for entry in entries)
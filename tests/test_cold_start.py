@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+import cold_start  # noqa: E402
+
+MOVIES_API = os.path.join(ROOT, "MoviesAPI")
+
+# Imports the function module in a fresh interpreter, with azure.functions
+# already loaded as it is in the worker, and prints the heavy SDKs it pulled in
+CHILD = f"""
+import sys
+import azure.functions
+sys.path.insert(0, {MOVIES_API!r})
+sys.stderr.write({cold_start.MARKER!r} + "\\n")
+sys.stderr.flush()
+import {{name}}
+print(",".join(heavy for heavy in {cold_start.HEAVY_MODULES!r} if heavy in sys.modules))
+"""
+
+
+def budget_ms():
+    return float(os.getenv('IMPORT_BUDGET_MS', '50'))
+
+
+@pytest.mark.parametrize("name", list(cold_start.REQUESTS))
+def test_function_module_loads_within_budget(name):
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD.format(name=name)],
+                             capture_output=True, text=True, cwd=MOVIES_API,
+                             env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"))
+    assert process.returncode == 0, process.stderr[-2000:]
+
+    heavy = process.stdout.strip()
+    assert not heavy, f"{name} imports {heavy} at load time"
+
+    imported = cold_start.parse_importtime(process.stderr.split(cold_start.MARKER + "\n")[1].splitlines())
+    import_ms = sum(cumulative for level, _, _, cumulative in imported if level == 0) / 1000
+    assert import_ms <= budget_ms(), f"{name} imports in {import_ms:.1f} ms (budget {budget_ms()} ms)"
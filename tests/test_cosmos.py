@@ -0,0 +1,69 @@
+import asyncio
+import contextvars
+
+from shared_code import cosmos
+
+
+class Closeable:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+def test_close_is_a_no_op_for_the_local_backend(monkeypatch, tmp_path):
+    data = tmp_path / "movies.json"
+    data.write_text('[{"id": "1", "title": "Inception", "releaseYear": "2010"}]')
+    monkeypatch.setenv("COSMOS_BACKEND", "local")
+    monkeypatch.setenv("LOCAL_COSMOS_DATA", str(data))
+    monkeypatch.delenv("COSMOS_ENDPOINT", raising=False)
+    cosmos.reset_client()
+    try:
+        container = cosmos.get_async_container()
+        assert container is cosmos.get_async_container()
+        asyncio.run(cosmos.close())
+    finally:
+        cosmos.reset_client()
+
+
+def test_close_closes_the_async_client_and_its_session(monkeypatch):
+    client, session = Closeable(), Closeable()
+    monkeypatch.setenv("COSMOS_ENDPOINT", "https://example.documents.azure.com")
+    monkeypatch.setenv("COSMOS_KEY", "key")
+    monkeypatch.setattr(cosmos, "_build_async_client", lambda settings: (client, session))
+    cosmos.reset_client()
+    try:
+        assert cosmos.get_async_client() is client
+        asyncio.run(cosmos.close())
+        assert client.closed and session.closed
+        # Closing again does nothing
+        asyncio.run(cosmos.close())
+    finally:
+        cosmos.reset_client()
+
+
+def test_client_stats_count_each_request_once(monkeypatch):
+    monkeypatch.setenv("COSMOS_ENDPOINT", "https://example.documents.azure.com")
+    monkeypatch.setenv("COSMOS_KEY", "key")
+    monkeypatch.setattr(cosmos, "_build_async_client", lambda settings: (Closeable(), Closeable()))
+    cosmos.reset_client()
+    before = cosmos.client_stats()
+
+    async def request():
+        # A request that asks for the client several times
+        for _ in range(3):
+            cosmos.get_async_client()
+
+    async def requests():
+        for _ in range(3):
+            await asyncio.create_task(request())
+
+    try:
+        # Like the Functions worker, start from a context no request has used
+        contextvars.Context().run(asyncio.run, requests())
+        stats = cosmos.client_stats()
+        assert stats["cold"] - before["cold"] == 1
+        assert stats["warm"] - before["warm"] == 2
+    finally:
+        cosmos.reset_client()
@@ -0,0 +1,23 @@
+import logging
+
+from shared_code import diagnostics
+
+
+def test_stats_are_logged_once_per_interval(monkeypatch, caplog):
+    monkeypatch.setenv("STATS_LOG_INTERVAL_SECONDS", "300")
+    monkeypatch.setattr(diagnostics, "_last_logged", diagnostics.time.monotonic() - 301)
+    with caplog.at_level(logging.INFO):
+        diagnostics.log_stats(summary_lookups=lambda: {"leaders": 1, "coalesced": 2})
+        diagnostics.log_stats()
+    logged = [record.getMessage() for record in caplog.records if record.getMessage().startswith("Worker stats")]
+    assert len(logged) == 1
+    for name in ("cosmos_clients", "mistral", "summary_generations", "summary_lookups"):
+        assert name in logged[0]
+
+
+def test_zero_interval_turns_logging_off(monkeypatch, caplog):
+    monkeypatch.setenv("STATS_LOG_INTERVAL_SECONDS", "0")
+    monkeypatch.setattr(diagnostics, "_last_logged", 0.0)
+    with caplog.at_level(logging.INFO):
+        diagnostics.log_stats()
+    assert not [record for record in caplog.records if record.getMessage().startswith("Worker stats")]
@@ -0,0 +1,52 @@
+import azure.functions as func
+
+from shared_code import compression, http_cache
+
+BODY = b'[' + b'{"title": "Inception"},' * 200 + b'{}]'
+
+
+def request(**headers):
+    return func.HttpRequest(method="GET", url="/api/getmovies", headers=headers, body=b"")
+
+
+def test_etag_is_stable_for_the_same_body():
+    assert http_cache.etag_for(BODY) == http_cache.etag_for(BODY.decode())
+    assert http_cache.etag_for(BODY) != http_cache.etag_for(BODY + b" ")
+
+
+def test_matches_uses_weak_comparison():
+    etag = http_cache.etag_for(BODY)
+    assert http_cache.matches(request(**{"If-None-Match": etag}), etag)
+    assert http_cache.matches(request(**{"If-None-Match": f'"other", W/{etag}'}), etag)
+    assert http_cache.matches(request(**{"If-None-Match": "*"}), etag)
+    assert not http_cache.matches(request(**{"If-None-Match": '"other"'}), etag)
+    assert not http_cache.matches(request(), etag)
+
+
+def test_200_carries_validators_and_compressed_body():
+    response = http_cache.respond(request(**{"Accept-Encoding": "gzip"}), BODY, "application/json", "GetMovies")
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"].endswith('-gzip"')
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.headers["Cache-Control"] == http_cache.DEFAULT_CACHE_CONTROL
+
+
+def test_304_does_not_compress(monkeypatch):
+    first = http_cache.respond(request(**{"Accept-Encoding": "gzip"}), BODY, "application/json", "GetMovies")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("compressed a body for a 304")
+
+    monkeypatch.setattr(compression, "compress", fail)
+    response = http_cache.respond(request(**{"Accept-Encoding": "gzip", "If-None-Match": first.headers["ETag"]}),
+                                  BODY, "application/json", "GetMovies")
+    assert response.status_code == 304
+    assert response.get_body() == b""
+    assert response.headers["ETag"] == first.headers["ETag"]
+
+
+def test_cache_control_per_endpoint(monkeypatch):
+    monkeypatch.setenv("CACHE_CONTROL_GETMOVIES", "no-cache")
+    assert http_cache.cache_control("GetMovies") == "no-cache"
+    assert http_cache.cache_control("SearchMovies") == http_cache.DEFAULT_CACHE_CONTROL
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import pytest
+
+from mock_mistral import MockMistral, start
+from shared_code import llm
+
+
+class Draws:
+    # Stands in for the mock's random.Random: each rate check takes the next
+    # value, and 1.0 (no injected failure) once the list runs out
+    def __init__(self, *values):
+        self.values = list(values)
+
+    def random(self):
+        return self.values.pop(0) if self.values else 1.0
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setenv("MISTRAL_BACKOFF_SECONDS", "0.01")
+    monkeypatch.setenv("MISTRAL_MAX_BACKOFF_SECONDS", "2")
+
+
+def call(monkeypatch, mock):
+    # Runs one completion against the mock; returns (text or LLMError, seconds)
+    async def main():
+        runner, base_url = await start(mock)
+        monkeypatch.setenv("MISTRAL_BASE_URL", base_url)
+        started = time.perf_counter()
+        try:
+            result = await llm.complete("Summarize Inception.", "mistral-tiny")
+        except llm.LLMError as e:
+            result = e
+        elapsed = time.perf_counter() - started
+        await llm.get_session().close()
+        await runner.cleanup()
+        return result, elapsed
+
+    return asyncio.run(main())
+
+
+def test_rate_limits_are_retried_after_retry_after(monkeypatch):
+    mock = MockMistral(rate_429=0.5, retry_after=0.3)
+    mock.rng = Draws(0.0)
+
+    text, elapsed = call(monkeypatch, mock)
+    assert isinstance(text, str) and text
+    assert mock.stats["rate_limited"] == 1 and mock.stats["completed"] == 1
+    assert elapsed >= 0.3
+
+
+def test_server_errors_are_retried(monkeypatch):
+    mock = MockMistral(error_rate=0.5, error_status=503)
+    # Two 503s, then a success
+    mock.rng = Draws(1.0, 0.0, 1.0, 0.0)
+
+    text, _ = call(monkeypatch, mock)
+    assert isinstance(text, str)
+    assert mock.stats["errors"] == 2 and mock.stats["completed"] == 1
+
+
+def test_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setenv("MISTRAL_MAX_RETRIES", "2")
+    mock = MockMistral(error_rate=1.0, error_status=502)
+
+    error, _ = call(monkeypatch, mock)
+    assert isinstance(error, llm.LLMError) and "HTTP 502" in str(error)
+    assert mock.stats["requests"] == 3
+
+
+def test_client_errors_are_not_retried(monkeypatch):
+    mock = MockMistral(error_rate=1.0, error_status=400)
+
+    error, _ = call(monkeypatch, mock)
+    assert isinstance(error, llm.LLMError) and "HTTP 400" in str(error)
+    assert mock.stats["requests"] == 1
+
+
+def test_each_attempt_is_bounded(monkeypatch):
+    monkeypatch.setenv("MISTRAL_ATTEMPT_TIMEOUT", "0.2")
+    monkeypatch.setenv("MISTRAL_MAX_RETRIES", "1")
+    mock = MockMistral(latency="fixed:2000")
+
+    error, elapsed = call(monkeypatch, mock)
+    assert isinstance(error, llm.LLMError) and "TimeoutError" in str(error)
+    assert mock.stats["requests"] == 2
+    assert elapsed < 1.5
+
+
+def test_deadline_covers_retries_and_backoff(monkeypatch):
+    monkeypatch.setenv("MISTRAL_DEADLINE_SECONDS", "0.5")
+    # Waiting out Retry-After would overrun the deadline, so the call stops
+    # after the first 429 instead of sleeping
+    mock = MockMistral(rate_429=1.0, retry_after=1.0)
+
+    error, elapsed = call(monkeypatch, mock)
+    assert isinstance(error, llm.LLMError) and "deadline" in str(error)
+    assert mock.stats["requests"] == 1
+    assert elapsed < 0.5
+
+    # A slow attempt is cut off at the deadline, below the per-attempt timeout
+    mock = MockMistral(latency="fixed:2000")
+    error, elapsed = call(monkeypatch, mock)
+    assert isinstance(error, llm.LLMError)
+    assert elapsed < 1.0
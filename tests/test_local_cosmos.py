@@ -0,0 +1,96 @@
+import pytest
+from azure.cosmos import exceptions
+
+from shared_code.local_cosmos import LocalContainer, _Query
+
+DOCS = [
+    {"id": "inception", "title": "Inception", "releaseYear": 2010, "genre": "Sci-Fi", "meta": {"rating": 8.8}},
+    {"id": "heat", "title": "Heat", "releaseYear": 1995, "genre": "Crime"},
+    {"id": "amelie", "title": "Amélie", "releaseYear": 2001, "genre": "Comedy", "meta": {"rating": 8.3}},
+    {"id": "untitled", "title": "Untitled"},
+]
+
+
+def run(query, parameters=None):
+    return _Query(query, parameters).run(DOCS)
+
+
+def ids(rows):
+    return [row["id"] for row in rows]
+
+
+def test_select_star_and_projection():
+    assert ids(run("SELECT * FROM c")) == ["inception", "heat", "amelie", "untitled"]
+    assert run("SELECT c.title, c.releaseYear FROM c WHERE c.id = 'heat'") == [{"title": "Heat", "releaseYear": 1995}]
+    # Missing properties are left out, as Cosmos does
+    assert run("SELECT c.id, c.releaseYear FROM c WHERE c.id = \"untitled\"") == [{"id": "untitled"}]
+    assert run("SELECT VALUE c.title FROM c WHERE c.releaseYear > 2000") == ["Inception", "Amélie"]
+
+
+def test_parameters_and_comparisons():
+    assert ids(run("SELECT * FROM c WHERE c.releaseYear = @year", [{"name": "@year", "value": 1995}])) == ["heat"]
+    assert ids(run("SELECT * FROM c WHERE c.releaseYear >= 2001 AND c.releaseYear <= 2010")) == ["inception", "amelie"]
+    assert ids(run("SELECT * FROM c WHERE c.releaseYear < 2000 OR c.genre = 'Comedy'")) == ["heat", "amelie"]
+    assert ids(run("SELECT * FROM c WHERE c.genre != 'Crime'")) == ["inception", "amelie"]
+    assert ids(run("SELECT * FROM c WHERE c.meta.rating > 8.5")) == ["inception"]
+    # A string never equals a number
+    assert run("SELECT * FROM c WHERE c.releaseYear = '1995'") == []
+
+
+def test_in_not_is_defined_and_parentheses():
+    parameters = [{"name": "@a", "value": "heat"}, {"name": "@b", "value": "amelie"}]
+    assert ids(run("SELECT * FROM c WHERE c.id IN (@a, @b)", parameters)) == ["heat", "amelie"]
+    assert ids(run("SELECT * FROM c WHERE NOT IS_DEFINED(c.releaseYear)")) == ["untitled"]
+    assert ids(run("SELECT * FROM c WHERE IS_DEFINED(c.meta) AND (c.releaseYear = 2001 OR c.id = 'x')")) == ["amelie"]
+
+
+def test_order_by_sorts_missing_values_lowest():
+    assert ids(run("SELECT * FROM c ORDER BY c.releaseYear")) == ["untitled", "heat", "amelie", "inception"]
+    assert ids(run("SELECT * FROM c ORDER BY c.releaseYear DESC")) == ["inception", "amelie", "heat", "untitled"]
+    assert ids(run("SELECT * FROM c ORDER BY c.meta.rating ASC")) == ["heat", "untitled", "amelie", "inception"]
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT c.id FROM movies",
+    "SELECT * FROM c WHERE c.id = @missing",
+    "SELECT * FROM c WHERE c.id LIKE 'x'",
+    "SELECT * FROM c GROUP BY c.genre",
+    "DELETE FROM c",
+])
+def test_unsupported_queries_are_rejected(query):
+    with pytest.raises(ValueError):
+        _Query(query, None)
+
+
+def test_results_are_copies():
+    container = LocalContainer(items=[dict(doc) for doc in DOCS])
+    movie = container.read_item("inception", partition_key="inception")
+    movie["meta"]["rating"] = 1.0
+    assert container.read_item("inception", partition_key="inception")["meta"]["rating"] == 8.8
+
+
+def test_point_reads_need_the_right_partition_key():
+    container = LocalContainer(items=[dict(doc) for doc in DOCS], partition_key_path="/releaseYear")
+    assert container.read_item("heat", partition_key=1995)["title"] == "Heat"
+    with pytest.raises(exceptions.CosmosResourceNotFoundError):
+        container.read_item("heat", partition_key=2010)
+
+
+def test_pages_change_feed_and_request_charge():
+    container = LocalContainer(items=[dict(doc) for doc in DOCS], physical_partitions=4)
+    assert container.request_charge == 0.0
+
+    pages = container.query_items("SELECT c.id FROM c", max_item_count=3).by_page()
+    first = list(next(pages))
+    token = pages.continuation_token
+    rest = list(next(container.query_items("SELECT c.id FROM c", max_item_count=3).by_page(token)))
+    assert ids(first + rest) == ids(DOCS)
+    # A cross-partition query pays for every physical partition it touches
+    assert container.request_charge > 4 * 2
+
+    feed = container.query_items_change_feed(start_time="Now").by_page()
+    assert [doc for page in feed for doc in page] == []
+    container.upsert_item({"id": "heat", "title": "Heat", "releaseYear": 1995, "genre": "Crime, Thriller"})
+    changes = [doc for page in container.query_items_change_feed(continuation=feed.continuation_token).by_page()
+               for doc in page]
+    assert ids(changes) == ["heat"]
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import time
+
+import azure.functions as func
+import pytest
+
+import GetMovieSummaries
+from mock_mistral import MockMistral, start
+from shared_code import cosmos, llm, summaries
+from shared_code.local_cosmos import AsyncLocalContainer
+
+MOVIES = [{"id": f"movie-{n}", "title": f"Movie {n}", "releaseYear": str(2000 + n), "genre": "Drama",
+           "coverUrl": f"https://example.com/{n}.jpg"} for n in range(6)]
+
+
+@pytest.fixture
+def store(monkeypatch):
+    # Movies and stored summaries live in local containers, and Mistral is the
+    # local stand-in; failures are not retried unless a test asks for it
+    monkeypatch.setenv("MISTRAL_MAX_RETRIES", "0")
+    movies = AsyncLocalContainer(items=[dict(movie) for movie in MOVIES])
+    summaries_container = AsyncLocalContainer(container_id="SummariesContainer")
+    monkeypatch.setattr(cosmos, "get_async_container",
+                        lambda container_id=None: summaries_container if container_id else movies)
+    return summaries_container
+
+
+def call(monkeypatch, mock, titles, params=None):
+    # Posts one batch to the handler; returns (results, status code)
+    req = func.HttpRequest(method="POST", url="/api/getmoviesummaries", params=params or {},
+                           body=json.dumps({"titles": titles}).encode("utf-8"))
+
+    async def main():
+        runner, base_url = await start(mock)
+        monkeypatch.setenv("MISTRAL_BASE_URL", base_url)
+        try:
+            return await GetMovieSummaries.main(req)
+        finally:
+            await llm.get_session().close()
+            await runner.cleanup()
+
+    response = asyncio.run(main())
+    if response.status_code != 200:
+        return response.get_body().decode("utf-8"), response.status_code
+    return json.loads(response.get_body()), response.status_code
+
+
+def stored(store, movie, text):
+    asyncio.run(summaries.store(movie, text, container=store))
+
+
+def test_results_follow_input_order_with_per_item_status(monkeypatch, store):
+    stored(store, MOVIES[0], "Stored summary.")
+    # Every generation fails, so Movie 1 is a 500 while Movie 0 is served
+    # from the store and the unknown title is a 404
+    mock = MockMistral(error_rate=1.0)
+
+    results, status = call(monkeypatch, mock, ["Movie 1", "No Such Movie", "Movie 0"])
+    assert status == 200
+    assert [result["title"] for result in results] == ["Movie 1", "No Such Movie", "Movie 0"]
+    assert [result["status"] for result in results] == [500, 404, 200]
+    assert results[2]["generatedSummary"] == "Stored summary."
+    assert mock.stats["requests"] == 1
+
+
+def test_repeated_titles_are_generated_once(monkeypatch, store):
+    mock = MockMistral()
+
+    results, _ = call(monkeypatch, mock, ["Movie 2", "movie 2", " MOVIE 2 ", "Movie 3"])
+    assert [result["status"] for result in results] == [200] * 4
+    assert len({result["generatedSummary"] for result in results[:3]}) == 1
+    assert mock.stats["completed"] == 2
+
+
+def test_batch_size_is_capped(monkeypatch, store):
+    monkeypatch.setenv("SUMMARY_BATCH_MAX_TITLES", "2")
+    mock = MockMistral()
+
+    message, status = call(monkeypatch, mock, ["Movie 0", "Movie 1", "Movie 2"])
+    assert status == 400 and "At most 2" in message
+    assert mock.stats["requests"] == 0
+
+
+@pytest.mark.parametrize("concurrency, rejected", [(2, False), (4, True)])
+def test_generations_are_bounded_by_concurrency(monkeypatch, store, concurrency, rejected):
+    # The stand-in turns away anything beyond two requests in flight
+    monkeypatch.setenv("SUMMARY_BATCH_CONCURRENCY", str(concurrency))
+    mock = MockMistral(latency="fixed:100", max_concurrency=2)
+
+    started = time.perf_counter()
+    results, _ = call(monkeypatch, mock, [movie["title"] for movie in MOVIES])
+    elapsed = time.perf_counter() - started
+    assert (mock.stats["rate_limited"] > 0) == rejected
+    if not rejected:
+        assert [result["status"] for result in results] == [200] * len(MOVIES)
+        # Six generations, two at a time
+        assert elapsed >= 0.3
+
+
+def test_refresh_bypasses_stored_summaries(monkeypatch, store):
+    stored(store, MOVIES[4], "Stored summary.")
+    mock = MockMistral()
+
+    results, _ = call(monkeypatch, mock, ["Movie 4"])
+    assert results[0]["generatedSummary"] == "Stored summary."
+    assert mock.stats["requests"] == 0
+
+    results, _ = call(monkeypatch, mock, ["Movie 4"], {"refresh": "true"})
+    assert results[0]["generatedSummary"] != "Stored summary."
+    assert mock.stats["completed"] == 1
+
+    # The fresh summary replaced the stored one
+    results, _ = call(monkeypatch, mock, ["Movie 4"])
+    assert results[0]["generatedSummary"] != "Stored summary."
+    assert mock.stats["completed"] == 1
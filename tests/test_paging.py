@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+import azure.functions as func
+import pytest
+
+import GetMovies
+import GetMoviesByYear
+from shared_code import cosmos, paging, partitioning
+from shared_code.local_cosmos import AsyncLocalContainer
+
+MOVIES = [{"id": f"movie-{n:02}", "title": f"Movie {n}", "releaseYear": str(2000 + n % 5)} for n in range(25)]
+
+
+def request(**params):
+    return func.HttpRequest(method="GET", url="/api/GetMovies", params=params, body=b"")
+
+
+def test_token_round_trip():
+    token = '{"token":"+RID:~abc==#RT:1","range":{"min":"","max":"FF"}}'
+    encoded = paging.encode_token(token)
+    assert "+" not in encoded and "/" not in encoded
+    assert paging.decode_token(encoded) == token
+    assert paging.encode_token(None) is None
+
+
+@pytest.mark.parametrize("token", ["", "not base64!", "////", paging.encode_token("x")[:-2] + "!!"])
+def test_malformed_tokens_are_rejected(token):
+    with pytest.raises(ValueError):
+        paging.decode_token(token)
+
+
+def test_page_params():
+    assert paging.page_params(request()) is None
+    assert paging.page_params(request(pageSize="10")) == (10, None)
+    assert paging.page_params(request(continuation=paging.encode_token("20"))) == (paging.DEFAULT_PAGE_SIZE, "20")
+    for size in ("0", str(paging.MAX_PAGE_SIZE + 1), "ten"):
+        with pytest.raises(ValueError):
+            paging.page_params(request(pageSize=size))
+
+
+def test_pages_cover_the_container_once(monkeypatch):
+    container = AsyncLocalContainer(items=[dict(movie) for movie in MOVIES])
+    monkeypatch.setattr(cosmos, "get_async_container", lambda container_id=None: container)
+
+    seen = []
+    params = {"pageSize": "10", "fields": "id"}
+    for _ in range(5):
+        response = asyncio.run(GetMovies.main(request(**params)))
+        assert response.status_code == 200
+        body = json.loads(response.get_body())
+        seen.extend(movie["id"] for movie in body["movies"])
+        if body["continuation"] is None:
+            break
+        params["continuation"] = body["continuation"]
+    assert seen == [movie["id"] for movie in MOVIES]
+
+
+def test_a_token_the_container_rejects_is_a_400(monkeypatch):
+    container = AsyncLocalContainer(items=[dict(movie) for movie in MOVIES])
+    monkeypatch.setattr(cosmos, "get_async_container", lambda container_id=None: container)
+
+    response = asyncio.run(GetMovies.main(request(continuation="%%%")))
+    assert response.status_code == 400
+    response = asyncio.run(GetMovies.main(request(continuation=paging.encode_token("not-a-position"))))
+    assert response.status_code == 400
+    assert response.get_body() == b"Invalid continuation token."
+
+
+@pytest.mark.parametrize("layout", [None, "releaseYear", "yearBucket"])
+def test_paged_by_year_matches_string_years(monkeypatch, layout):
+    # releaseYear is stored as a string in movies.json and the generated catalogs
+    if layout is None:
+        monkeypatch.delenv("COSMOS_PARTITION_KEY", raising=False)
+    else:
+        monkeypatch.setenv("COSMOS_PARTITION_KEY", layout)
+    items = [partitioning.prepare_document(dict(movie), layout) for movie in MOVIES]
+    container = AsyncLocalContainer(items=items, partition_key_path=f"/{layout or 'id'}")
+    monkeypatch.setattr(cosmos, "get_async_container", lambda container_id=None: container)
+
+    req = func.HttpRequest(method="GET", url="/api/getmoviesbyyear/2002", route_params={"year": "2002"},
+                           params={"pageSize": "3", "fields": "id,releaseYear"}, body=b"")
+    seen = []
+    while True:
+        body = json.loads(asyncio.run(GetMoviesByYear.main(req)).get_body())
+        seen.extend(body["movies"])
+        if body["continuation"] is None:
+            break
+        req = func.HttpRequest(method="GET", url="/api/getmoviesbyyear/2002", route_params={"year": "2002"},
+                               params={"pageSize": "3", "fields": "id,releaseYear",
+                                       "continuation": body["continuation"]}, body=b"")
+    expected = [movie["id"] for movie in MOVIES if movie["releaseYear"] == "2002"]
+    assert sorted(movie["id"] for movie in seen) == expected
+    assert {movie["releaseYear"] for movie in seen} == {"2002"}
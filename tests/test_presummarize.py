@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from shared_code import llm, presummarize
+from shared_code.local_cosmos import AsyncLocalContainer
+
+MOVIES = [{"id": str(n), "title": f"Movie {n}", "releaseYear": str(2000 + n)} for n in range(5)]
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limit(monkeypatch):
+    monkeypatch.setenv("PRESUMMARIZE_RATE_PER_SECOND", "0")
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def fake_complete(calls):
+    async def complete(prompt, model):
+        calls.append(prompt)
+        return "A summary."
+    return complete
+
+
+def test_uses_the_given_summaries_container(monkeypatch):
+    calls = []
+    monkeypatch.setattr(llm, "complete", fake_complete(calls))
+    movies = AsyncLocalContainer(items=[dict(movie) for movie in MOVIES])
+    store = AsyncLocalContainer(container_id="Summaries")
+
+    stats = run(presummarize.run(movies, store, time_budget=60))
+    assert stats["complete"] and stats["generated"] == len(MOVIES)
+    assert len(calls) == len(MOVIES)
+
+    # Everything is stored, so a second pass generates nothing
+    stats = run(presummarize.run(movies, store, time_budget=60))
+    assert stats["generated"] == 0 and len(calls) == len(MOVIES)
+
+
+def test_invalid_checkpoint_starts_a_new_pass(monkeypatch):
+    calls = []
+    monkeypatch.setattr(llm, "complete", fake_complete(calls))
+    monkeypatch.setenv("PRESUMMARIZE_PAGE_SIZE", "2")
+    movies = AsyncLocalContainer(items=[dict(movie) for movie in MOVIES])
+    store = AsyncLocalContainer(container_id="Summaries")
+    run(presummarize.save_checkpoint(store, "not-a-token"))
+
+    stats = run(presummarize.run(movies, store, time_budget=60))
+    assert stats["complete"] and stats["scanned"] == len(MOVIES)
+    assert run(presummarize.load_checkpoint(store)) is None
+
+
+def test_checkpoint_resumes_after_the_time_budget(monkeypatch):
+    monkeypatch.setattr(llm, "complete", fake_complete([]))
+    monkeypatch.setenv("PRESUMMARIZE_PAGE_SIZE", "2")
+    movies = AsyncLocalContainer(items=[dict(movie) for movie in MOVIES])
+    store = AsyncLocalContainer(container_id="Summaries")
+
+    stats = run(presummarize.run(movies, store, time_budget=0))
+    assert not stats["complete"] and stats["scanned"] == 2
+    assert run(presummarize.load_checkpoint(store)) is not None
+
+    stats = run(presummarize.run(movies, store, time_budget=60))
+    assert stats["complete"] and stats["scanned"] == 3
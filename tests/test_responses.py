@@ -0,0 +1,48 @@
+import azure.functions as func
+
+from shared_code import projection, responses
+
+
+def request(params=None, **headers):
+    return func.HttpRequest(method="GET", url="/api/getmovies", headers=headers, params=params or {}, body=b"")
+
+
+def test_field_order_is_canonical():
+    assert projection.fields_param(request({"fields": "title,id"})) == ("id", "title")
+    assert projection.fields_param(request({"fields": "id,title"})) == ("id", "title")
+    assert projection.fields_param(request()) == projection.DEFAULT_FIELDS
+
+
+def test_cached_body_is_reused_while_version_is_unchanged(monkeypatch):
+    monkeypatch.setattr(responses, "_serialized", type(responses._serialized)())
+    source = [{"title": "Inception"}]
+    builds = []
+
+    def build(movies):
+        builds.append(movies)
+        return movies
+
+    first = responses.respond_cached(request(), ("test",), 1, source, build, "GetMovies")
+    second = responses.respond_cached(request(), ("test",), 1, source, build, "GetMovies")
+    assert len(builds) == 1
+    assert first.get_body() == second.get_body()
+
+    responses.respond_cached(request(), ("test",), 2, list(source), build, "GetMovies")
+    assert len(builds) == 2
+    # Data without a version is encoded every time
+    responses.respond_cached(request(), ("test",), None, source, build, "GetMovies")
+    responses.respond_cached(request(), ("test",), None, source, build, "GetMovies")
+    assert len(builds) == 4
+
+
+def test_cache_is_bounded_by_bytes(monkeypatch):
+    monkeypatch.setattr(responses, "_serialized", type(responses._serialized)())
+    monkeypatch.setenv("RESPONSE_CACHE_BYTES", "5000")
+    source = [{"title": "x" * 1000}]
+    for n in range(20):
+        responses.respond_cached(request(), ("test", n), 1, source, lambda movies: movies, "GetMovies")
+    stats = responses.serialized_stats()
+    assert stats["bytes"] <= 5000
+    assert 1 <= stats["entries"] < 20
+    # The most recent variant is the one kept
+    assert ("test", 19) in {key[0] for key in responses._serialized}
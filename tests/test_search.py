@@ -0,0 +1,36 @@
+from collections import Counter
+
+from shared_code import search
+
+# Every title shares "the", so its trigrams are common; a few also share rarer words
+MOVIES = [{"id": str(n), "title": f"The {word} {n}"} for n, word in
+          enumerate(["Night", "Day", "River", "Mountain"] * 500)]
+MOVIES.append({"id": "crimson", "title": "The Crimson Knight of Paris"})
+
+
+class CountingCounter(Counter):
+    scanned = 0
+
+    def update(self, iterable=None, **kwargs):
+        iterable = list(iterable or ())
+        CountingCounter.scanned += len(iterable)
+        super().update(iterable, **kwargs)
+
+
+def test_common_trigrams_scan_a_bounded_share(monkeypatch):
+    index = search.build(MOVIES)
+    monkeypatch.setattr(search, "Counter", CountingCounter)
+    common = max(100, int(len(MOVIES) * search.COMMON_TRIGRAM_SHARE))
+
+    results = index.search("the", limit=5)
+    assert len(results) == 5
+    assert all("the" in movie["title"].lower().split() for _, movie in results)
+    assert CountingCounter.scanned <= common + len(search.trigrams("the"))
+
+
+def test_long_queries_still_find_their_title(monkeypatch):
+    index = search.build(MOVIES)
+    monkeypatch.setattr(search, "RARE_POSTINGS_BUDGET", 1)
+    results = index.search("crimson knight of paris", limit=3)
+    assert results[0][1]["id"] == "crimson"
+    assert index.search("the river 18")[0][1]["title"] == "The River 18"
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from shared_code.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "summary"
+
+    async def main():
+        return await asyncio.gather(*(flight.do("inception", fetch) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["summary"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"leaders": 1, "coalesced": 4, "inflight": 0}
+
+
+def test_every_waiter_gets_the_error():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("Mistral is down")
+
+    async def main():
+        return await asyncio.gather(*(flight.do("inception", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.stats()["inflight"] == 0
+
+
+def test_later_calls_start_a_new_flight():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return len(calls)
+
+    async def main():
+        return [await flight.do("inception", fetch), await flight.do("inception", fetch)]
+
+    assert asyncio.run(main()) == [1, 2]
+
+
+def test_a_cancelled_waiter_does_not_cancel_the_call():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "summary"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("inception", fetch))
+        second = asyncio.ensure_future(flight.do("inception", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "summary"
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import tracemalloc
+
+import azure.functions as func
+import pytest
+from azure.core.async_paging import AsyncItemPaged, AsyncList
+
+import GetMovies
+from shared_code import cosmos, streaming
+
+
+class SyntheticContainer:
+    # Generates documents page by page, so the only memory that can grow with
+    # the catalog is whatever the code under test retains.
+    def __init__(self, count):
+        self.count = count
+
+    def query_items(self, query, parameters=None, max_item_count=None, **kwargs):
+        page_size = max_item_count or 100
+
+        async def get_next(continuation):
+            start = int(continuation or 0)
+            return start, [
+                {"title": f"Movie {i}", "releaseYear": str(1950 + i % 75),
+                 "genre": "Action, Drama", "coverUrl": f"https://example.invalid/{i}.jpg"}
+                for i in range(start, min(start + page_size, self.count))
+            ]
+
+        async def extract_data(response):
+            start, page = response
+            end = start + len(page)
+            return (str(end) if end < self.count else None), AsyncList(page)
+
+        return AsyncItemPaged(get_next, extract_data)
+
+
+def peak_of(coroutine_fn):
+    tracemalloc.start()
+    try:
+        result = asyncio.run(coroutine_fn())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, result
+
+
+async def documents(count):
+    return [item async for item in SyntheticContainer(count).query_items("SELECT * FROM c")]
+
+
+@pytest.mark.parametrize("fmt", streaming.FORMATS)
+def test_serialized_output_is_valid(fmt):
+    async def main():
+        chunks, _ = streaming.serialize(streaming.iter_query(SyntheticContainer(1200), "SELECT * FROM c"), fmt)
+        return await streaming.read_all(chunks)
+
+    body = asyncio.run(main()).decode("utf-8")
+    expected = asyncio.run(documents(1200))
+    if fmt == "json":
+        assert json.loads(body) == expected
+    else:
+        assert [json.loads(line) for line in body.splitlines()] == expected
+
+
+@pytest.mark.parametrize("fmt", streaming.FORMATS)
+def test_serializer_peak_does_not_grow_with_the_catalog(fmt):
+    # Chunks are consumed and dropped, as a host that can stream would do
+    async def consume(count):
+        chunks, _ = streaming.serialize(streaming.iter_query(SyntheticContainer(count), "SELECT * FROM c"), fmt)
+        return sum([len(chunk) async for chunk in chunks])
+
+    small, _ = peak_of(lambda: consume(2_000))
+    large, size = peak_of(lambda: consume(20_000))
+    assert size > 10 * streaming.CHUNK_SIZE
+    assert large < small * 1.5
+
+
+def test_handler_peak_is_bounded_by_the_body(monkeypatch):
+    # The v1 worker needs the whole body before it responds, so the handler
+    # joins the chunks: its peak grows with the catalog. What it must not do
+    # is hold the documents as a list or a pretty-printed copy as well, which
+    # costs several times the body.
+    count = 20_000
+    monkeypatch.setattr(cosmos, "get_async_container", lambda container_id=None: SyntheticContainer(count))
+    req = func.HttpRequest(method="GET", url="/api/GetMovies", params={"stream": "ndjson"}, body=b"")
+
+    peak, response = peak_of(lambda: GetMovies.main(req))
+    body = response.get_body()
+    assert response.status_code == 200
+    assert len(body.splitlines()) == count
+    assert peak < 2.5 * len(body)
+
+    materialized, _ = peak_of(lambda: documents(count))
+    assert peak < materialized
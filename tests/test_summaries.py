@@ -0,0 +1,94 @@
+import asyncio
+import json
+import time
+
+import azure.functions as func
+import pytest
+
+import GetMovieSummary
+from shared_code import cosmos, llm, summaries
+from shared_code.local_cosmos import AsyncLocalContainer
+
+MOVIE = {"id": "inception", "title": "Inception", "releaseYear": "2010", "genre": "Action, Sci-Fi",
+         "coverUrl": "https://example.com/inception.jpg"}
+DAY = 24 * 3600
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def stored_doc(created_at, model=summaries.MODEL):
+    return {"id": summaries.summary_id(MOVIE, model), "title": MOVIE["title"], "summary": "Stored summary.",
+            "createdAt": created_at}
+
+
+def test_stored_summaries_expire(monkeypatch):
+    monkeypatch.setenv("SUMMARY_MAX_AGE_SECONDS", str(DAY))
+    now = time.time()
+    fresh = AsyncLocalContainer(items=[stored_doc(now - DAY + 60)])
+    expired = AsyncLocalContainer(items=[stored_doc(now - DAY - 60)])
+
+    assert run(summaries.get_cached(MOVIE, container=fresh)) == "Stored summary."
+    assert run(summaries.get_cached(MOVIE, container=expired)) is None
+    assert run(summaries.get_cached_many([MOVIE], container=fresh)) == {summaries.summary_id(MOVIE): "Stored summary."}
+    assert run(summaries.get_cached_many([MOVIE], container=expired)) == {}
+
+
+def test_max_age_zero_keeps_summaries_forever(monkeypatch):
+    monkeypatch.setenv("SUMMARY_MAX_AGE_SECONDS", "0")
+    ancient = AsyncLocalContainer(items=[stored_doc(0)])
+    assert run(summaries.get_cached(MOVIE, container=ancient)) == "Stored summary."
+
+    # Nor is a Cosmos TTL set on new entries
+    store = AsyncLocalContainer()
+    run(summaries.store(MOVIE, "New summary.", container=store))
+    doc = run(store.read_item(item=summaries.summary_id(MOVIE), partition_key=summaries.summary_id(MOVIE)))
+    assert "ttl" not in doc
+
+
+def test_summary_id_changes_with_model_and_prompt(monkeypatch):
+    original = summaries.summary_id(MOVIE)
+    assert summaries.summary_id({"title": "  INCEPTION "}) == original
+    assert summaries.summary_id(MOVIE, "mistral-large-latest") != original
+
+    monkeypatch.setattr(summaries, "PROMPT_TEMPLATE", "Summarize '{title}' in one sentence.")
+    assert summaries.summary_id(MOVIE) != original
+
+    # A summary stored under the old prompt is not served for the new one
+    store = AsyncLocalContainer(items=[dict(stored_doc(time.time()), id=original)])
+    assert run(summaries.get_cached(MOVIE, container=store)) is None
+
+
+@pytest.fixture
+def summary_store(monkeypatch):
+    movies = AsyncLocalContainer(items=[dict(MOVIE)])
+    store = AsyncLocalContainer(container_id="SummariesContainer", items=[stored_doc(time.time())])
+    monkeypatch.setattr(cosmos, "get_async_container", lambda container_id=None: store if container_id else movies)
+    return store
+
+
+def get_summary(params=None):
+    req = func.HttpRequest(method="GET", url="/api/getmoviesummary/Inception", route_params={"title": "Inception"},
+                           params=params or {}, body=b"")
+    response = run(GetMovieSummary.main(req))
+    assert response.status_code == 200
+    return json.loads(response.get_body())[0]["generatedSummary"]
+
+
+def test_refresh_regenerates_a_stored_summary(monkeypatch, summary_store):
+    prompts = []
+
+    async def complete(prompt, model):
+        prompts.append(prompt)
+        return "Fresh summary."
+    monkeypatch.setattr(llm, "complete", complete)
+
+    assert get_summary() == "Stored summary."
+    assert prompts == []
+
+    assert get_summary({"refresh": "true"}) == "Fresh summary."
+    assert len(prompts) == 1
+    # The regenerated summary is stored and served from then on
+    assert get_summary() == "Fresh summary."
+    assert len(prompts) == 1
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+import backfill_title_ids
+from shared_code import catalog_cache, titles
+from shared_code.local_cosmos import AsyncLocalContainer, LocalContainer
+
+INCEPTION = {"title": "Inception", "releaseYear": "2010", "genre": "Sci-Fi", "coverUrl": "inception.jpg"}
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.delenv("COSMOS_PARTITION_KEY", raising=False)
+    monkeypatch.setattr(titles, "_key_paths", {})
+    catalog_cache.invalidate()
+    yield
+    catalog_cache.invalidate()
+
+
+def test_title_id_normalizes_case_accents_and_spaces():
+    assert titles.title_id("The  Dark Knight ") == "the-dark-knight"
+    assert titles.title_id("AMÉLIE") == "amelie"
+
+
+@pytest.mark.parametrize("path, doc", [
+    ("/id", {"id": "inception"}),
+    ("/releaseYear", {"id": "inception"}),
+    ("/partitionKey", {"id": "inception", "partitionKey": "movies-7"}),
+])
+def test_read_movie_with_any_partition_key_path(path, doc):
+    container = AsyncLocalContainer(items=[dict(INCEPTION, **doc)], partition_key_path=path)
+    movie = asyncio.run(titles.read_movie("inception", container))
+    assert movie["id"] == "inception"
+    assert asyncio.run(titles.read_movie("Interstellar", container)) is None
+
+
+def test_backfill_reads_the_partition_key_path():
+    container = LocalContainer(items=[dict(INCEPTION, id="guid-1", partitionKey="movies-7")],
+                               partition_key_path="/partitionKey")
+    assert backfill_title_ids.backfill(container, log=lambda message: None) == (1, 0)
+    assert [doc["id"] for doc in container.query_items("SELECT c.id FROM c")] == ["inception"]
+
+
+def test_backfill_finishes_an_interrupted_run():
+    # The copy was written but the original was not deleted
+    container = LocalContainer(items=[dict(INCEPTION, id="guid-1"), dict(INCEPTION, id="inception")])
+    assert backfill_title_ids.backfill(container, log=lambda message: None) == (1, 0)
+    assert [doc["id"] for doc in container.query_items("SELECT c.id FROM c")] == ["inception"]
+    # Nothing left to do on the next run
+    assert backfill_title_ids.backfill(container, log=lambda message: None) == (0, 0)
+
+
+def test_backfill_skips_real_collisions():
+    container = LocalContainer(items=[dict(INCEPTION, id="guid-1"), dict(INCEPTION, id="guid-2", releaseYear="1999")])
+    assert backfill_title_ids.backfill(container, log=lambda message: None) == (0, 2)
+
+
+def test_backfill_tolerates_an_original_that_is_already_gone(monkeypatch):
+    container = LocalContainer(items=[dict(INCEPTION, id="guid-1")])
+    delete_item = container.delete_item
+
+    def delete_twice(item, partition_key=None, **kwargs):
+        delete_item(item, partition_key)
+        delete_item(item, partition_key)
+
+    monkeypatch.setattr(container, "delete_item", delete_twice)
+    logged = []
+    assert backfill_title_ids.backfill(container, log=logged.append) == (1, 0)
+    assert "guid-1 was already deleted" in logged
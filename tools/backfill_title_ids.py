@@ -0,0 +1,89 @@
+"""Give existing movie documents their title-slug ids.
+
+GetMovieSummary point-reads movies by shared_code.titles.title_id(title). This
+copies every document whose id is not yet that slug to a new document with the
+slug id and then deletes the original. Titles whose slugs collide are reported
+and left untouched. Run with --dry-run first to see what would change.
+
+The partition key path is read from the container, and the tool is safe to
+run again after an interrupted run: an original whose copy already exists is
+deleted, and one that is already gone is skipped.
+
+    python tools/backfill_title_ids.py [--dry-run]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "MoviesAPI"))
+
+from shared_code import cosmos, partitioning, titles  # noqa: E402
+
+SYSTEM_PROPERTIES = ("_rid", "_self", "_etag", "_attachments", "_ts", "_lsn")
+
+
+def _content(doc):
+    return {name: value for name, value in doc.items() if name not in SYSTEM_PROPERTIES and name != "id"}
+
+
+def _delete(container, doc, path, log):
+    try:
+        container.delete_item(item=doc["id"], partition_key=partitioning.key_value(doc, path))
+    except cosmos.exceptions.CosmosResourceNotFoundError:
+        log(f"{doc['id']} was already deleted")
+
+
+def backfill(container, dry_run=False, log=print):
+    path = partitioning.key_path(container.read())
+    docs = list(container.query_items(query="SELECT * FROM c", enable_cross_partition_query=True))
+
+    owners = {}
+    for doc in docs:
+        owners.setdefault(titles.title_id(doc["title"]), []).append(doc)
+
+    moved = skipped = 0
+    for new_id, group in owners.items():
+        done = [doc for doc in group if doc["id"] == new_id]
+        if done:
+            # Originals left behind by an interrupted run are identical to
+            # their copy apart from the id; anything else is a real collision
+            leftovers = [doc for doc in group if doc["id"] != new_id and _content(doc) == _content(done[0])]
+            if len(leftovers) == len(group) - 1:
+                for doc in leftovers:
+                    log(f"{doc['id']} -> {new_id} ({doc['title']}, copy already exists)")
+                    if not dry_run:
+                        _delete(container, doc, path, log)
+                    moved += 1
+                continue
+        if len(group) > 1:
+            log(f"Skipping {new_id!r}: shared by {', '.join(repr(doc['title']) for doc in group)}")
+            skipped += len(group)
+            continue
+        doc = group[0]
+        if doc["id"] == new_id:
+            continue
+
+        log(f"{doc['id']} -> {new_id} ({doc['title']})")
+        if not dry_run:
+            copy = _content(doc)
+            copy["id"] = new_id
+            container.upsert_item(copy)
+            _delete(container, doc, path, log)
+        moved += 1
+    return moved, skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--container", default=None, help="container to backfill (default: COSMOS_CONTAINER_ID)")
+    parser.add_argument("--dry-run", action="store_true", help="only print the ids that would change")
+    args = parser.parse_args(argv)
+
+    moved, skipped = backfill(cosmos.get_container(args.container), args.dry_run)
+    verb = "Would move" if args.dry_run else "Moved"
+    print(f"{verb} {moved} documents to title ids; {skipped} skipped because of slug collisions.")
+    return 1 if skipped else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""Generate a synthetic movie catalog of any size.
+
+Catalogs are deterministic for a given --seed and --count, so benchmark runs
+on different commits see the same data. Titles are unique and use the
+title-slug ids GetMovieSummary reads by. Release years lean towards recent
+decades the way real catalogs do, and each movie has one to three genres
+drawn with realistic weights (Drama and Comedy common, Western rare).
+Movies are produced one at a time, so even 10M-movie catalogs are written
+without holding them in memory.
+
+Formats:
+    json     one JSON array, like movies.json
+    ndjson   one document per line; COSMOS_BACKEND=local loads this directly
+    bulk     a directory of NDJSON files grouped for bulk loading: one file per
+             partition key value when --key is releaseYear or yearBucket
+             (documents get the yearBucket property where needed), otherwise
+             files of --bulk-size documents; manifest.json lists them
+
+    python tools/generate_catalog.py --count 100000 --format ndjson --output catalog.ndjson
+    python tools/generate_catalog.py --count 10000000 --format bulk --key yearBucket --output catalog/
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "MoviesAPI"))
+
+from shared_code import partitioning, titles  # noqa: E402
+
+FORMATS = ("json", "ndjson", "bulk")
+
+ADJECTIVES = ("Dark", "Last", "Silent", "Broken", "Hidden", "Golden", "Final", "Lost", "Wild", "Crimson",
+              "Eternal", "Forgotten", "Savage", "Secret", "Burning", "Frozen", "Hollow", "Midnight",
+              "Electric", "Distant", "Bitter", "Sacred", "Iron", "Velvet", "Shattered", "Endless", "Fallen",
+              "Rising", "Restless", "Scarlet", "Quiet", "Lonely", "Perfect", "Dangerous", "Little", "Great")
+NOUNS = ("Knight", "City", "River", "Empire", "Storm", "Heart", "Shadow", "Kingdom", "Road", "Dream",
+         "Horizon", "Garden", "Machine", "Ocean", "Promise", "Hunter", "Stranger", "Mountain", "Signal",
+         "Witness", "Harvest", "Frontier", "Island", "Legacy", "Mirror", "Prophecy", "Voyage", "Fortress",
+         "Summer", "Winter", "Engine", "Circle", "Border", "Crown", "Station", "Lighthouse", "Orchard")
+PLACES = ("Paris", "Tokyo", "Berlin", "the North", "the Valley", "Avalon", "Babylon", "the Desert",
+          "the Sea", "Brooklyn", "Saturn", "the Moon", "Cairo", "the Coast", "Harlem", "Vienna", "the Delta",
+          "Mars", "the Highlands", "Havana", "Rome", "the Bay", "Istanbul", "Memphis")
+PATTERNS = (
+    "The {adjective} {noun} of {place}",
+    "{adjective} {noun} in {place}",
+    "Return to {place}: The {adjective} {noun}",
+    "A {adjective} {noun} over {place}",
+    "{place} and the {adjective} {noun}",
+    "Beyond {place}: {adjective} {noun}",
+    "The {noun} Who Left {place} {adjective}",
+    "Tales of {place}: The {adjective} {noun}",
+)
+
+# (genre, weight)
+GENRES = (("Drama", 30), ("Comedy", 18), ("Action", 12), ("Thriller", 10), ("Romance", 8),
+          ("Horror", 7), ("Crime", 7), ("Science Fiction", 5), ("Documentary", 5), ("Adventure", 5),
+          ("Animation", 4), ("Fantasy", 4), ("Mystery", 3), ("Family", 3), ("War", 2), ("Musical", 1),
+          ("Western", 1))
+
+FIRST_YEAR = 1920
+LAST_YEAR = 2024
+
+
+def _year_weights():
+    # Output roughly doubles every 20 years
+    return [2 ** ((year - FIRST_YEAR) / 20) for year in range(FIRST_YEAR, LAST_YEAR + 1)]
+
+
+def _title(i, combinations, stride):
+    # Index -> unique title: a bijective scramble of i picks one combination of
+    # pattern and words; past the last combination a sequel number is added
+    j = (i * stride) % combinations
+    j, adjective = divmod(j, len(ADJECTIVES))
+    j, noun = divmod(j, len(NOUNS))
+    pattern, place = divmod(j, len(PLACES))
+    title = PATTERNS[pattern].format(adjective=ADJECTIVES[adjective], noun=NOUNS[noun], place=PLACES[place])
+    sequel = i // combinations
+    return title if sequel == 0 else f"{title} {sequel + 1}"
+
+
+def generate(count, seed=7):
+    # Yields `count` movie documents; the same seed always gives the same catalog
+    rng = random.Random(seed)
+    combinations = len(PATTERNS) * len(ADJECTIVES) * len(NOUNS) * len(PLACES)
+    stride = rng.randrange(1, combinations)
+    while math.gcd(stride, combinations) != 1:
+        stride += 1
+
+    years = list(range(FIRST_YEAR, LAST_YEAR + 1))
+    year_weights = list(_cumulative(_year_weights()))
+    genre_names = [name for name, _ in GENRES]
+    genre_weights = list(_cumulative(weight for _, weight in GENRES))
+    for i in range(count):
+        title = _title(i, combinations, stride)
+        genres = []
+        for _ in range(rng.choice((1, 1, 2, 2, 2, 3))):
+            genre = rng.choices(genre_names, cum_weights=genre_weights)[0]
+            if genre not in genres:
+                genres.append(genre)
+        yield {
+            "id": titles.title_id(title),
+            "title": title,
+            "releaseYear": str(rng.choices(years, cum_weights=year_weights)[0]),
+            "genre": ", ".join(genres),
+            "coverUrl": f"https://example.invalid/covers/{titles.title_id(title)}.jpg",
+        }
+
+
+def _cumulative(weights):
+    total = 0
+    for weight in weights:
+        total += weight
+        yield total
+
+
+def write_json(movies, path):
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for movie in movies:
+            f.write(("," if count else "") + "\n" + json.dumps(movie))
+            count += 1
+        f.write("\n]\n")
+    return count
+
+
+def write_ndjson(movies, path):
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for movie in movies:
+            f.write(json.dumps(movie) + "\n")
+            count += 1
+    return count
+
+
+def write_bulk(movies, directory, key=None, bulk_size=100000):
+    # One file per partition key value when the layout groups by year, so each
+    # file is a single-partition batch; plain fixed-size files otherwise
+    os.makedirs(directory, exist_ok=True)
+    files = {}
+    counts = {}
+    count = 0
+    try:
+        for movie in movies:
+            if key is not None:
+                movie = partitioning.prepare_document(movie, key)
+                name = f"{key}-{partitioning.partition_key_for_year(movie['releaseYear'], key)}.ndjson"
+            else:
+                name = f"part-{count // bulk_size:05d}.ndjson"
+            if name not in files:
+                if key is None and files:
+                    # Fixed-size parts are written in order; close the last one
+                    for handle in files.values():
+                        handle.close()
+                    files.clear()
+                files[name] = open(os.path.join(directory, name), "w", encoding="utf-8")
+            files[name].write(json.dumps(movie) + "\n")
+            counts[name] = counts.get(name, 0) + 1
+            count += 1
+    finally:
+        for handle in files.values():
+            handle.close()
+
+    manifest = {
+        "documents": count,
+        "partitionKey": f"/{key or 'id'}",
+        "files": [{"path": name, "documents": counts[name]} for name in sorted(counts)],
+    }
+    with open(os.path.join(directory, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument("--output", required=True, help="file for json/ndjson, directory for bulk")
+    parser.add_argument("--key", choices=partitioning.LAYOUTS, help="partition layout for the bulk format")
+    parser.add_argument("--bulk-size", type=int, default=100000, help="documents per bulk file without --key")
+    args = parser.parse_args(argv)
+
+    movies = generate(args.count, args.seed)
+    if args.format == "json":
+        count = write_json(movies, args.output)
+    elif args.format == "ndjson":
+        count = write_ndjson(movies, args.output)
+    else:
+        count = write_bulk(movies, args.output, args.key, args.bulk_size)
+    print(f"Wrote {count} movies to {args.output}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
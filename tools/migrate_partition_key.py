@@ -0,0 +1,75 @@
+"""Copy the movies container into a container partitioned by release year.
+
+Creates the target container (if needed) with /releaseYear or /yearBucket as
+its partition key and upserts every document from the source into it, adding
+the derived yearBucket property when that layout is chosen. Re-running the
+copy is safe; upserts simply overwrite.
+
+Uses the same COSMOS_* settings as the functions:
+
+    python tools/migrate_partition_key.py --target MoviesByYear --key releaseYear
+
+Once the copy is verified, point COSMOS_CONTAINER_ID at the target container
+and set COSMOS_PARTITION_KEY to the chosen key.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "MoviesAPI"))
+
+from azure.cosmos import PartitionKey  # noqa: E402
+
+from shared_code import cosmos, partitioning  # noqa: E402
+
+# Server-managed properties that must not be copied onto the new documents
+SYSTEM_PROPERTIES = ("_rid", "_self", "_etag", "_attachments", "_ts", "_lsn")
+
+
+def copy_documents(source, target, key, bucket_size=None, page_size=500, log=print):
+    copied = 0
+    pages = source.query_items(
+        query="SELECT * FROM c",
+        enable_cross_partition_query=True,
+        max_item_count=page_size
+    ).by_page()
+    for page in pages:
+        for doc in page:
+            for name in SYSTEM_PROPERTIES:
+                doc.pop(name, None)
+            target.upsert_item(partitioning.prepare_document(doc, key, bucket_size))
+            copied += 1
+        log(f"Copied {copied} documents...")
+    return copied
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=os.getenv('COSMOS_CONTAINER_ID', 'MoviesContainer'),
+                        help="container to copy from (default: COSMOS_CONTAINER_ID)")
+    parser.add_argument("--target", required=True, help="container to create and copy into")
+    parser.add_argument("--key", choices=partitioning.LAYOUTS, default=partitioning.RELEASE_YEAR,
+                        help="partition key of the target container")
+    parser.add_argument("--bucket-size", type=int, default=partitioning.bucket_size(),
+                        help="years per bucket for the yearBucket layout")
+    parser.add_argument("--throughput", type=int, default=None, help="RU/s to provision on the new container")
+    args = parser.parse_args(argv)
+
+    if args.source == args.target:
+        parser.error("--source and --target must be different containers.")
+
+    cosmos.get_database().create_container_if_not_exists(
+        id=args.target,
+        partition_key=PartitionKey(path="/" + args.key),
+        offer_throughput=args.throughput
+    )
+
+    copied = copy_documents(cosmos.get_container(args.source), cosmos.get_container(args.target),
+                            args.key, args.bucket_size)
+    print(f"Done: {copied} documents copied from {args.source} to {args.target} (partition key /{args.key}).")
+    print(f"Set COSMOS_CONTAINER_ID={args.target} and COSMOS_PARTITION_KEY={args.key} to switch over.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""Local stand-in for the Mistral chat completions API.
+
+Serves POST /v1/chat/completions with the same request and response shapes as
+api.mistral.ai, both plain and streamed (server-sent events), so the summary
+functions can be load-tested without API credits or network. Point the
+functions at it with MISTRAL_BASE_URL=http://127.0.0.1:8089.
+
+Latency, streaming speed and failures are configurable and seeded, so runs
+are reproducible:
+
+    --latency fixed:200 | uniform:100:300 | normal:200:50 | lognormal:200:0.5 | exponential:200
+                          time to first token in ms (lognormal takes the median)
+    --tokens 60           tokens per completion (capped by the request's max_tokens)
+    --tokens-per-second   streaming speed; 0 sends every token at once
+    --rate-429 0.1        share of requests rejected with 429 and Retry-After
+    --max-concurrency 8   requests beyond this many in flight also get 429
+    --error-rate 0.05     share of requests failed with --error-status
+
+GET /stats returns request, 429 and error counts.
+
+    python tools/mock_mistral.py [--port 8089] [--latency normal:300:80] [--rate-429 0.05]
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from aiohttp import web
+
+WORDS = ("a gripping story of ambition loss and redemption told through memorable characters "
+         "with striking visuals and a score that lingers long after the credits roll").split()
+
+
+def parse_latency(spec):
+    # Returns a function of a random.Random that draws one latency in seconds
+    kind, *values = spec.split(":")
+    try:
+        values = [float(value) for value in values]
+    except ValueError:
+        raise ValueError(f"Invalid latency: {spec}")
+    shapes = {
+        "fixed": (1, lambda rng, ms: ms),
+        "uniform": (2, lambda rng, low, high: rng.uniform(low, high)),
+        "normal": (2, lambda rng, mean, stdev: rng.gauss(mean, stdev)),
+        "lognormal": (2, lambda rng, median, sigma: median * rng.lognormvariate(0, sigma)),
+        "exponential": (1, lambda rng, mean: rng.expovariate(1 / mean) if mean else 0.0),
+    }
+    if kind not in shapes or len(values) != shapes[kind][0]:
+        raise ValueError(f"Invalid latency: {spec}. Use one of: fixed:MS, uniform:LOW:HIGH, "
+                         f"normal:MEAN:STDEV, lognormal:MEDIAN:SIGMA, exponential:MEAN.")
+    draw = shapes[kind][1]
+    return lambda rng: max(0.0, draw(rng, *values)) / 1000
+
+
+class MockMistral:
+    def __init__(self, latency="fixed:0", tokens=60, tokens_per_second=0.0, rate_429=0.0, retry_after=1.0,
+                 max_concurrency=0, error_rate=0.0, error_status=500, seed=0):
+        self.latency = parse_latency(latency)
+        self.tokens = tokens
+        self.tokens_per_second = tokens_per_second
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.max_concurrency = max_concurrency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rng = random.Random(seed)
+        self.inflight = 0
+        self.stats = {"requests": 0, "completed": 0, "rate_limited": 0, "errors": 0, "streamed": 0}
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self.completions)
+        app.router.add_get("/stats", self.get_stats)
+        return app
+
+    def _text(self, payload):
+        count = min(self.tokens, int(payload.get("max_tokens") or self.tokens))
+        prompt = " ".join(message.get("content", "") for message in payload.get("messages", []))
+        # Same prompt, same text, so cached and fresh answers can be compared
+        rng = random.Random(prompt)
+        return [("" if i == 0 else " ") + rng.choice(WORDS) for i in range(count)]
+
+    async def completions(self, request):
+        self.stats["requests"] += 1
+        try:
+            payload = await request.json()
+        except ValueError:
+            return web.json_response({"message": "Invalid JSON body"}, status=400)
+
+        if (self.max_concurrency and self.inflight >= self.max_concurrency) or self.rng.random() < self.rate_429:
+            self.stats["rate_limited"] += 1
+            return web.json_response({"message": "Requests rate limit exceeded"}, status=429,
+                                     headers={"Retry-After": str(self.retry_after)})
+        if self.rng.random() < self.error_rate:
+            self.stats["errors"] += 1
+            return web.json_response({"message": "Injected error"}, status=self.error_status)
+
+        self.inflight += 1
+        try:
+            await asyncio.sleep(self.latency(self.rng))
+            tokens = self._text(payload)
+            if payload.get("stream"):
+                self.stats["streamed"] += 1
+                return await self._stream(request, payload, tokens)
+            self.stats["completed"] += 1
+            return web.json_response(self._completion(payload, "".join(tokens)))
+        finally:
+            self.inflight -= 1
+
+    def _completion(self, payload, text):
+        return {
+            "id": f"mock-{self.stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": len(text.split()), "total_tokens": len(text.split())},
+        }
+
+    async def _stream(self, request, payload, tokens):
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        delay = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0
+        for token in tokens:
+            event = {"model": payload.get("model"), "choices": [{"index": 0, "delta": {"content": token}}]}
+            await response.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            if delay:
+                await asyncio.sleep(delay)
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        self.stats["completed"] += 1
+        return response
+
+    async def get_stats(self, request):
+        return web.json_response(dict(self.stats, inflight=self.inflight))
+
+
+async def start(mock, host="127.0.0.1", port=0):
+    # Starts serving in the running event loop; returns (runner, base URL)
+    runner = web.AppRunner(mock.app())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{port}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", default="fixed:200", help="time to first token, e.g. normal:300:80 (ms)")
+    parser.add_argument("--tokens", type=int, default=60)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--max-concurrency", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    try:
+        mock = MockMistral(args.latency, args.tokens, args.tokens_per_second, args.rate_429, args.retry_after,
+                           args.max_concurrency, args.error_rate, args.error_status, args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Mock Mistral listening on http://{args.host}:{args.port} (set MISTRAL_BASE_URL to this).")
+    web.run_app(mock.app(), host=args.host, port=args.port, print=None)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""Generate missing or stale movie summaries from the command line.
+
+Runs the same resumable backfill as the PresummarizeMovies timer function,
+using the COSMOS_* and mistral_api_key settings. Progress is checkpointed in
+the summaries container, so an interrupted run continues where it stopped.
+
+    python tools/presummarize.py [--time-budget 3600] [--until-complete]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "MoviesAPI"))
+
+from shared_code import cosmos, llm, presummarize  # noqa: E402
+
+
+async def backfill(time_budget, until_complete):
+    try:
+        while True:
+            stats = await presummarize.run(time_budget=time_budget)
+            print(f"Generated {stats['generated']} of {stats['scanned']} scanned "
+                  f"({stats['failed']} failed, pass complete: {stats['complete']}).")
+            if stats["complete"] or not until_complete:
+                return stats
+    finally:
+        await llm.get_session().close()
+        await cosmos.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--time-budget", type=float, default=None,
+                        help="seconds per run (default: PRESUMMARIZE_TIME_BUDGET_SECONDS)")
+    parser.add_argument("--until-complete", action="store_true",
+                        help="keep starting new runs until the whole catalog has been covered")
+    args = parser.parse_args(argv)
+
+    stats = asyncio.run(backfill(args.time_budget, args.until_complete))
+    return 0 if stats["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())